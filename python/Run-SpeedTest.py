@@ -1,13 +1,18 @@
 import subprocess
 import json
-import time
 import datetime
 from pathlib import Path
 from colorama import Fore, Style
 
 # Assuming write_log_entry is already defined
 
-def run_speedtest(log_path: str, speedtest_path: str, timestamp_format: str = "%H:%M:%S"):
+def run_speedtest(log_path: str, speedtest_path: str, timestamp_format: str = "%H:%M:%S", on_progress=None):
+    """Run the Ookla CLI and report live rates as its JSONL events arrive.
+
+    ``on_progress(phase, value, progress)`` is called for every progress event:
+    phase is "ping" (value = latency in ms) or "download"/"upload" (value = Mbps),
+    progress is the CLI's 0..1 completion fraction for that phase.
+    """
     write_log_entry("--- Speed Test ---", log_path, color="Cyan")
 
     speedtest_exe = Path(speedtest_path) / "speedtest.exe"
@@ -15,38 +20,53 @@ def run_speedtest(log_path: str, speedtest_path: str, timestamp_format: str = "%
         write_log_entry(f"Speedtest CLI not found at {speedtest_exe}", log_path, color="Red")
         return None
 
+    if on_progress is None:
+        def on_progress(phase, value, progress):
+            unit = "ms" if phase == "ping" else "Mbps"
+            print(f"\r{phase.capitalize():<8} {value:>8.2f} {unit:<4} {progress * 100:>3.0f}%", end="", flush=True)
+
     try:
-        # Simulate progress bar
-        print("Running Speedtest...", end="", flush=True)
-        progress = 0
-        spinner = ["|", "/", "-", "\\"]
-        spin_index = 0
+        print("Running Speedtest...", flush=True)
 
-        # Start speedtest process
+        # jsonl + progress makes the CLI emit one JSON event per line while it runs
         process = subprocess.Popen(
-            [str(speedtest_exe), "--format=json"],
+            [str(speedtest_exe), "--format=jsonl", "--progress=yes"],
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
+            bufsize=1,
             shell=True
         )
 
-        # Show progress while running
-        while process.poll() is None:
-            print(f"\rTesting... {spinner[spin_index]} {progress}%", end="", flush=True)
-            spin_index = (spin_index + 1) % len(spinner)
-            progress = (progress + 5) % 100
-            time.sleep(0.5)
+        result = None
+        errors = []
+        # Blocks on the pipe until the next line arrives; no polling loop
+        for line in process.stdout:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                if line.strip():
+                    errors.append(line.strip())
+                continue
+            kind = event.get("type")
+            if kind == "ping":
+                on_progress("ping", event["ping"]["latency"], event["ping"].get("progress", 0))
+            elif kind in ("download", "upload"):
+                data = event[kind]
+                on_progress(kind, data["bandwidth"] / 125000, data.get("progress", 0))
+            elif kind == "result":
+                result = event
+            elif kind == "log" and event.get("level") == "error":
+                errors.append(event.get("message", ""))
+        process.wait()
 
-        print("\rSpeedtest complete.           ")
+        print("\rSpeedtest complete.                         ")
 
-        stdout, stderr = process.communicate()
-        if not stdout:
-            write_log_entry("Speedtest failed or returned no data.", log_path, color="Red")
+        if not result:
+            reason = f": {errors[-1]}" if errors else ""
+            write_log_entry(f"Speedtest failed or returned no data{reason}", log_path, color="Red")
             return None
 
-        result = json.loads(stdout)
-
         download_mbps = round(result["download"]["bandwidth"] / 125000, 2)
         upload_mbps = round(result["upload"]["bandwidth"] / 125000, 2)
         ping_latency = round(result["ping"]["latency"], 2)
@@ -0,0 +1,61 @@
+import ipaddress
+
+from config import config
+from geo_cache import geo_summary, get_cached_geo, store_geo
+from http_session import get_session
+from ip_range_db import open_database
+
+
+_BATCH_FIELDS = "status,message,query,country,regionName,city,isp,as,timezone"
+
+
+def _is_public(ip: str) -> bool:
+    try:
+        return ipaddress.ip_address(ip).is_global
+    except ValueError:
+        return False
+
+
+def _batch_lookup(ips: list[str], url: str, batch_size: int) -> dict[str, dict]:
+    results = {}
+    session = get_session()
+    for offset in range(0, len(ips), batch_size):
+        response = session.post(url, params={"fields": _BATCH_FIELDS}, json=ips[offset:offset + batch_size], timeout=8)
+        response.raise_for_status()
+        for entry in response.json():
+            if entry.get("status") == "success" and entry.get("query"):
+                results[entry["query"]] = geo_summary(entry["query"], entry)
+    return results
+
+
+def geolocate_ips(ips: list[str], batch_url: str | None = None) -> dict[str, dict | None]:
+    """Geolocate many addresses at once and return {ip: summary or None}.
+
+    Private and invalid addresses map to None without a lookup. Cached results are
+    reused; the rest come from the offline database when GeoDatabasePath is set,
+    otherwise from one POST to the batch endpoint per GeoBatchSize addresses.
+    Raises requests.RequestException if the batch endpoint fails.
+    """
+    defaults = config["Defaults"]
+    public = [ip for ip in dict.fromkeys(ips) if ip and _is_public(ip)]
+    results = get_cached_geo(public)
+    misses = [ip for ip in public if ip not in results]
+
+    if misses:
+        if defaults["GeoDatabasePath"]:
+            records = open_database(defaults["GeoDatabasePath"]).lookup_many(misses)
+            found = {ip: geo_summary(ip, record) for ip, record in records.items() if record}
+        else:
+            found = _batch_lookup(misses, batch_url or defaults["GeoBatchURL"], defaults["GeoBatchSize"])
+        store_geo(found)
+        results.update(found)
+
+    return {ip: results.get(ip) for ip in dict.fromkeys(ips) if ip}
+
+
+def annotate_hop_locations(hops: list[dict], batch_url: str | None = None) -> list[dict]:
+    """Set each hop record's Geo to its location summary (None for private or unknown hops)."""
+    locations = geolocate_ips([hop.get("Address") for hop in hops], batch_url)
+    for hop in hops:
+        hop["Geo"] = locations.get(hop.get("Address"))
+    return hops
@@ -10,16 +10,84 @@ config = {
         "TargetHost": "8.8.8.8",
         "LogDirectory": str(BASE_DIR / "logs"),
         "TimestampFormat": "%H:%M:%S",
+        "LogFlushInterval": 0.5,  # seconds buffered log lines may wait before reaching disk
+        # Shared DNS cache (seconds to keep successful / failed lookups)
+        "DNSCacheTTL": 300,
+        "DNSNegativeTTL": 30,
         # Ping Test
         "PingCount": 4,
         "PingDelay": 1000,  # milliseconds
+        "PingMaxWorkers": 16,  # concurrent targets for multi-target ping
+        # High-rate ping sampling
+        "HighRateCount": 1000,
+        "HighRateInterval": 20,  # milliseconds
+        # TCP connect latency probe (used when ICMP ping is unavailable)
+        "TcpPingPort": 443,
+        "TcpPingConcurrency": 8,
+        "TcpPingTimeout": 1000,  # milliseconds
+        # Traceroute ("parallel" probes every TTL at once in-process, "system" shells out)
+        "TracerouteEngine": "parallel",
+        "TracerouteMaxHops": 30,
+        "TracerouteProbes": 3,
+        "TracerouteTimeout": 2000,  # milliseconds to wait for the slowest hop
+        "TracerouteGeolocate": True,  # annotate hops with location and ASN/ISP
+        "ReverseDNSTimeout": 2.0,  # seconds per PTR lookup
+        "ReverseDNSTTL": 3600,  # seconds a hop name (or NXDOMAIN) stays cached; timeouts use DNSNegativeTTL
+        "ReverseDNSCacheSize": 1024,
+        "MTRRounds": 10,
+        "MTRInterval": 1.0,  # seconds between MTR rounds
         # Bufferbloat / MTU discovery
         "BufferStartSize": 1500,
         "MTUStopSize": 100,
-        "MTUDecrement": 20,
+        "MTUProbeTimeout": 2,  # seconds per probe
+        "MTUParallelProbes": 1,  # sizes probed per bisection round
+        "MTUProbeRetries": 2,  # extra attempts for a size that got no reply (not an explicit frag-needed)
+        "MTUCacheTTL": 86400,  # seconds a discovered MTU is trusted before a full search
+        # Bufferbloat / latency under load
+        "BufferbloatDownloadURL": "https://speed.cloudflare.com/__down?bytes=100000000",
+        "BufferbloatUploadURL": "https://speed.cloudflare.com/__up",
+        "BufferbloatDuration": 10,  # seconds per phase
+        "BufferbloatStreams": 4,
+        "BufferbloatSampleInterval": 100,  # milliseconds between RTT samples
+        # DNS resolver benchmark
+        "DNSResolvers": ["1.1.1.1", "8.8.8.8", "9.9.9.9"],
+        "DNSTestNames": ["google.com", "cloudflare.com", "wikipedia.org", "github.com", "amazon.com"],
+        "DNSTestRepeats": 3,  # cached passes after the first (uncached) pass
+        "DNSTestTimeout": 2.0,  # seconds per query
+        "DNSIncludeStandin": False,  # also benchmark a local stand-in resolver
         # Speedtest CLI
         "SpeedtestPath": str(Path.home() / "AppData" / "Local" / "Speedtest"),
+        "SpeedtestEngine": "speedtest-cli",  # or "native" for the built-in multi-stream HTTP engine
+        "SpeedtestServerCacheTTL": 86400,  # seconds the server list and best server are reused
+        "SpeedtestReselectFactor": 1.5,  # re-select when cached server latency exceeds its baseline by this factor
+        # Native throughput engine
+        "ThroughputDownloadURL": "https://speed.cloudflare.com/__down?bytes=100000000",
+        "ThroughputUploadURL": "https://speed.cloudflare.com/__up",
+        "ThroughputStreams": 8,
+        "ThroughputDuration": 10,  # seconds per direction
+        "ThroughputBufferSize": 256 * 1024,  # bytes per read / send
+        "ThroughputUploadBytes": 25_000_000,  # bytes per upload request
         # Optional features
         "EnableIPGeo": True,
+        "GeoCacheTTL": 604800,  # seconds a geolocation result for an IP is reused
+        # Offline geolocation: range CSV (compiled to a .idx next to it) or a compiled .idx; empty = online only
+        "GeoDatabasePath": "",
+        "GeoDatabaseColumns": ["Start", "End", "Continent", "Country", "Region", "City", "Lat", "Lon"],
+        "GeoBatchURL": "http://ip-api.com/batch",
+        "GeoBatchSize": 100,  # addresses per batch request (ip-api's limit)
+        "RunAllParallel": True,  # run independent tests of "Run All" concurrently; speedtest always runs alone
+        # Shared HTTP session
+        "HTTPPoolConnections": 10,  # hosts with a kept-alive connection pool
+        "HTTPPoolMaxSize": 10,  # idle connections kept per host
+        "HTTPRetries": 0,
+        "HTTPUserAgent": "Network-Diag-Utilities",
+        # Continuous monitoring (seconds between runs; 0 disables a probe)
+        "MonitorIntervals": {
+            "Ping": 60,
+            "Traceroute": 900,
+            "MTU": 3600,
+            "Geo": 3600,
+        },
+        "MonitorJitter": 0.1,  # fraction of each interval used to spread probe start times
     }
 }
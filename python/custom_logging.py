@@ -1,18 +1,154 @@
 from colorama import init, Fore, Style
+import atexit
 import datetime
+import queue
+import threading
+import time
 from pathlib import Path
 
+from config import config
+
 init(autoreset=True)
 
+# Log files kept open by the writer thread; the least recently used is closed beyond this
+_MAX_OPEN_FILES = 32
+
+
+class _LogWriter:
+    """Background thread that owns every log file handle.
+
+    Callers only enqueue text, so a log line costs no syscalls on the calling thread.
+    Queued lines are written in order into buffered handles that are flushed every
+    LogFlushInterval seconds, on flush_logs() and at interpreter exit.
+    """
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._handles = {}
+        self._dirty = set()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def write(self, logpath, text):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush, close=True)
+        self._queue.put((str(logpath), text))
+
+    def flush(self, close=False):
+        """Block until everything queued so far is on disk (or the writer thread is gone)."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put((None, (done, close)))
+        while not done.wait(0.5):
+            if not self._thread.is_alive():
+                return
+
+    def _close(self, logpath, report=True):
+        handle = self._handles.pop(logpath)
+        self._dirty.discard(logpath)
+        try:
+            handle.close()
+        except OSError as exc:
+            # close() flushes first; the buffered lines are lost but the handle is released
+            if report:
+                print(Fore.RED + f"Could not write to {logpath}: {exc}" + Style.RESET_ALL)
+
+    def _handle(self, logpath):
+        handle = self._handles.pop(logpath, None)
+        if handle is None:
+            if len(self._handles) >= _MAX_OPEN_FILES:
+                self._close(next(iter(self._handles)))
+            Path(logpath).parent.mkdir(parents=True, exist_ok=True)
+            handle = open(logpath, "a", encoding="utf-8")
+        # Re-insert so dict order tracks recency
+        self._handles[logpath] = handle
+        return handle
+
+    def _flush_dirty(self):
+        for logpath in list(self._dirty):
+            try:
+                self._handles[logpath].flush()
+            except OSError as exc:
+                # Drop the failing handle (full disk, EIO, ...); the next line for it reopens the file
+                print(Fore.RED + f"Could not write to {logpath}: {exc}" + Style.RESET_ALL)
+                self._close(logpath, report=False)
+        self._dirty.clear()
+
+    def _run(self):
+        interval = config["Defaults"]["LogFlushInterval"]
+        last_flush = time.monotonic()
+        while True:
+            try:
+                logpath, text = self._queue.get(timeout=interval)
+            except queue.Empty:
+                self._flush_dirty()
+                last_flush = time.monotonic()
+                continue
+
+            if logpath is None:
+                done, close = text
+                try:
+                    self._flush_dirty()
+                    if close:
+                        for path in list(self._handles):
+                            self._close(path)
+                finally:
+                    done.set()
+                continue
+
+            try:
+                self._handle(logpath).write(text)
+                self._dirty.add(logpath)
+            except OSError as exc:
+                print(Fore.RED + f"Could not write to {logpath}: {exc}" + Style.RESET_ALL)
+                if logpath in self._handles:
+                    self._close(logpath, report=False)
+            if time.monotonic() - last_flush >= interval:
+                self._flush_dirty()
+                last_flush = time.monotonic()
+
+
+_writer = _LogWriter()
+
+
+class _LogHandle:
+    """File-like stand-in for open(logpath, "a") that appends through the shared writer."""
+
+    def __init__(self, logpath):
+        self._logpath = str(logpath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def write(self, text):
+        _writer.write(self._logpath, text)
+        return len(text)
+
+
+def open_log(logpath):
+    """Use instead of open(logpath, "a") for raw output so it stays ordered with write_log_entry()."""
+    return _LogHandle(logpath)
+
+
+def flush_logs():
+    """Wait until every queued log line has been written and flushed."""
+    _writer.flush()
+
+
 def write_log_entry(message, logpath, color=None):
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     entry = f"[{timestamp}] {message}"
 
-    Path(logpath).parent.mkdir(parents=True, exist_ok=True)
-
-    # Write to log file
-    with open(logpath, "a", encoding="utf-8") as f:
-        f.write(entry + "\n")
+    # Write to log file (queued; the writer thread does the I/O)
+    _writer.write(logpath, entry + "\n")
 
     # Print to console with optional color
     if color:
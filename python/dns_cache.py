@@ -0,0 +1,56 @@
+import ipaddress
+import socket
+import threading
+import time
+
+from config import config
+
+
+# host -> (address or the lookup error, expiry); shared by every test in this process
+_cache: dict[str, tuple[str | OSError, float]] = {}
+_lock = threading.Lock()
+
+
+def resolve(host: str) -> str:
+    """Resolve ``host`` to an IPv4 address through the process-wide cache.
+
+    Successful lookups are kept for DNSCacheTTL seconds and failures for DNSNegativeTTL
+    seconds; a cached failure is raised again as the original socket error.
+    """
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(host)
+    if entry and entry[1] > now:
+        if isinstance(entry[0], OSError):
+            raise entry[0]
+        return entry[0]
+
+    defaults = config["Defaults"]
+    try:
+        address = socket.gethostbyname(host)
+    except OSError as exc:
+        with _lock:
+            _cache[host] = (exc, now + defaults["DNSNegativeTTL"])
+        raise
+    with _lock:
+        _cache[host] = (address, now + defaults["DNSCacheTTL"])
+    return address
+
+
+def resolve_or_host(host: str) -> str:
+    """Like resolve(), but hand back ``host`` unchanged so the caller's own tool can report the failure."""
+    try:
+        return resolve(host)
+    except OSError:
+        return host
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
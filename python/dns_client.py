@@ -0,0 +1,104 @@
+import asyncio
+import random
+import struct
+import time
+
+
+QTYPE_A = 1
+QCLASS_IN = 1
+RCODE_NAMES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+
+
+def build_query(query_id: int, name: str, qtype: int = QTYPE_A) -> bytes:
+    # Header: id, flags (RD set), 1 question, no answer/authority/additional records
+    header = struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0)
+    labels = b"".join(bytes([len(label)]) + label.encode("idna") for label in name.strip(".").split(".") if label)
+    return header + labels + b"\x00" + struct.pack("!HH", qtype, QCLASS_IN)
+
+
+def _skip_name(packet: bytes, offset: int) -> int:
+    while True:
+        length = packet[offset]
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        if length == 0:
+            return offset + 1
+        offset += length + 1
+
+
+def parse_response(packet: bytes) -> tuple[int, int, list[str]]:
+    """Return (query_id, rcode, IPv4 answers) from a DNS response packet."""
+    query_id, flags, qdcount, ancount, _nscount, _arcount = struct.unpack("!HHHHHH", packet[:12])
+    offset = 12
+    for _ in range(qdcount):
+        offset = _skip_name(packet, offset) + 4
+    addresses = []
+    for _ in range(ancount):
+        offset = _skip_name(packet, offset)
+        rtype, _rclass, _ttl, rdlength = struct.unpack("!HHIH", packet[offset:offset + 10])
+        offset += 10
+        if rtype == QTYPE_A and rdlength == 4:
+            addresses.append(".".join(str(b) for b in packet[offset:offset + 4]))
+        offset += rdlength
+    return query_id, flags & 0x000F, addresses
+
+
+class _DNSProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.transport = None
+        self.pending: dict[int, asyncio.Future] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            query_id, rcode, addresses = parse_response(data)
+        except (struct.error, IndexError):
+            return
+        future = self.pending.pop(query_id, None)
+        if future and not future.done():
+            future.set_result((rcode, addresses))
+
+    def error_received(self, exc):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc)
+        self.pending.clear()
+
+
+class DNSClient:
+    """Minimal asyncio UDP stub resolver that keeps many queries in flight on one socket."""
+
+    def __init__(self, server: str, port: int = 53, timeout: float = 2.0):
+        self.server = server
+        self.port = port
+        self.timeout = timeout
+        self._protocol: _DNSProtocol | None = None
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        _transport, self._protocol = await loop.create_datagram_endpoint(
+            _DNSProtocol, remote_addr=(self.server, self.port)
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._protocol.transport.close()
+
+    async def query(self, name: str, qtype: int = QTYPE_A) -> tuple[float | None, int | None, list[str]]:
+        """Return (latency_ms, rcode, addresses); latency and rcode are None on timeout or socket error."""
+        loop = asyncio.get_running_loop()
+        query_id = random.getrandbits(16)
+        while query_id in self._protocol.pending:
+            query_id = random.getrandbits(16)
+        future = loop.create_future()
+        self._protocol.pending[query_id] = future
+        started = time.perf_counter_ns()
+        self._protocol.transport.sendto(build_query(query_id, name, qtype))
+        try:
+            rcode, addresses = await asyncio.wait_for(future, self.timeout)
+        except (asyncio.TimeoutError, OSError):
+            self._protocol.pending.pop(query_id, None)
+            return None, None, []
+        return (time.perf_counter_ns() - started) / 1_000_000, rcode, addresses
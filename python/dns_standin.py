@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import socketserver
+import struct
+import threading
+import time
+
+
+class StandinDNSHandler(socketserver.BaseRequestHandler):
+    """Answers every A query with ``server.answer``.
+
+    The first query for a name is delayed by ``server.miss_delay`` seconds to mimic a
+    recursive lookup, later ones are answered immediately as if from cache.
+    """
+
+    def handle(self):
+        data, sock = self.request
+        if len(data) < 12:
+            return
+        query_id, _flags, qdcount = struct.unpack("!HHH", data[:6])
+        offset = 12
+        labels = []
+        while data[offset]:
+            labels.append(data[offset + 1:offset + 1 + data[offset]].decode("ascii", "replace"))
+            offset += data[offset] + 1
+        question = data[12:offset + 5]
+        name = ".".join(labels).lower()
+
+        with self.server.lock:
+            miss = name not in self.server.seen
+            self.server.seen.add(name)
+        if miss and self.server.miss_delay:
+            time.sleep(self.server.miss_delay)
+
+        header = struct.pack("!HHHHHH", query_id, 0x8180, qdcount, 1, 0, 0)
+        answer = b"\xc0\x0c" + struct.pack("!HHIH", 1, 1, 60, 4) + bytes(int(o) for o in self.server.answer.split("."))
+        sock.sendto(header + question + answer, self.client_address)
+
+
+def start_dns_standin(host: str = "127.0.0.1", port: int = 0, answer: str = "127.0.0.1", miss_delay: float = 0.02):
+    """Serve the stand-in on a daemon thread and return (server, "host:port")."""
+    server = socketserver.ThreadingUDPServer((host, port), StandinDNSHandler)
+    server.daemon_threads = True
+    server.answer = answer
+    server.miss_delay = miss_delay
+    server.seen = set()
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    dns_server, address = start_dns_standin(port=5353)
+    print(f"Stand-in DNS server listening on {address}")
+    threading.Event().wait()
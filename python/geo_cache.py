@@ -0,0 +1,33 @@
+from json_cache import JSONCache
+
+
+# Compact: the file can hold thousands of hop addresses
+_cache = JSONCache("geo_cache.json", "GeoCacheTTL", compact=True)
+
+
+def geo_summary(ip: str, entry: dict) -> dict:
+    """Normalise an ip-api answer, offline database record or older cached summary to one schema."""
+    return {
+        "ISP": entry.get("isp") or entry.get("ISP") or "Unknown",
+        "ASN": entry.get("as") or entry.get("ASN") or "Unknown",
+        "City": entry.get("city") or entry.get("City") or "Unknown",
+        "Region": entry.get("regionName") or entry.get("Region") or "Unknown",
+        "Country": entry.get("country") or entry.get("Country") or "Unknown",
+        "Timezone": entry.get("timezone") or entry.get("Timezone") or "Unknown",
+        "IP": ip,
+    }
+
+
+def get_cached_geo(ips: list[str], ttl: float | None = None) -> dict[str, dict]:
+    """Return {ip: summary} for every address in ``ips`` cached less than ``ttl`` seconds ago."""
+    cache = _cache.fresh(ttl)
+    return {ip: geo_summary(ip, cache[ip]["Geo"]) for ip in ips if ip in cache}
+
+
+def store_geo(results: dict[str, dict]) -> bool:
+    """Cache {ip: summary} in one write, dropping expired entries.
+
+    Returns False if the cache file could not be written; the cache is only an
+    optimisation, so callers keep their results either way.
+    """
+    return _cache.store({ip: {"Geo": geo_summary(ip, geo)} for ip, geo in results.items()})
@@ -0,0 +1,42 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import config
+
+
+_session: requests.Session | None = None
+_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session every HTTP-based test should use.
+
+    Connections are kept alive between calls, so repeat lookups to the same host skip
+    the TCP and TLS handshakes. HTTPPoolConnections caps how many hosts keep a pool and
+    HTTPPoolMaxSize how many idle connections each host keeps.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            defaults = config["Defaults"]
+            adapter = HTTPAdapter(
+                pool_connections=defaults["HTTPPoolConnections"],
+                pool_maxsize=defaults["HTTPPoolMaxSize"],
+                max_retries=defaults["HTTPRetries"],
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = defaults["HTTPUserAgent"]
+            _session = session
+        return _session
+
+
+def close_session():
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+CHUNK = bytes(64 * 1024)
+DEFAULT_DOWNLOAD_BYTES = 100_000_000
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Offline stand-in for the HTTP endpoints the diagnostics talk to.
+
+    GET /__down?bytes=N streams N zero bytes and POST /__up drains the request body,
+    mirroring the speed.cloudflare.com endpoints used for load generation. POST /batch
+    answers like ip-api.com's batch geolocation endpoint.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/__down":
+            self.send_error(404)
+            return
+        size = int(parse_qs(url.query).get("bytes", [DEFAULT_DOWNLOAD_BYTES])[0])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        try:
+            while size > 0:
+                chunk = CHUNK if size >= len(CHUNK) else CHUNK[:size]
+                self.wfile.write(chunk)
+                size -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path == "/batch":
+            self._batch_geolocation()
+            return
+        if path != "/__up":
+            self.send_error(404)
+            return
+        received = self._drain_body()
+        body = f'{{"received": {received}}}'.encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up mid-upload (e.g. a timed load phase ended)
+            self.close_connection = True
+
+    def _batch_geolocation(self):
+        # ip-api style answer with a fixed, obviously fake location for every address
+        ips = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"[]")
+        body = json.dumps(
+            [
+                {
+                    "status": "success",
+                    "query": ip,
+                    "country": "Standin",
+                    "regionName": "Loopback",
+                    "city": "Localhost",
+                    "isp": "Stand-in ISP",
+                    "as": "AS64496 Stand-in",
+                    "timezone": "UTC",
+                }
+                for ip in ips
+            ]
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _drain_body(self) -> int:
+        received = 0
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return received
+                received += len(self.rfile.read(size))
+                self.rfile.readline()
+        remaining = int(self.headers.get("Content-Length", 0))
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, len(CHUNK)))
+            if not chunk:
+                break
+            received += len(chunk)
+            remaining -= len(chunk)
+        return received
+
+
+def start_standin_server(host: str = "127.0.0.1", port: int = 0, handler=StandinHandler):
+    """Serve ``handler`` on a daemon thread and return (server, base_url); call server.shutdown() to stop."""
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    httpd = ThreadingHTTPServer(("127.0.0.1", 8080), StandinHandler)
+    print("Stand-in HTTP server listening on http://127.0.0.1:8080")
+    httpd.serve_forever()
@@ -0,0 +1,139 @@
+import os
+import select
+import socket
+import struct
+import time
+from collections.abc import Iterator
+
+from dns_cache import resolve
+from ping_stats import PingStats
+
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+PAYLOAD = b"Network-Diag-Utilities".ljust(32, b"\x00")
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _echo_request(ident: int, seq: int, payload: bytes = PAYLOAD) -> bytes:
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    checksum = _checksum(header + payload)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + payload
+
+
+def open_icmp_socket() -> tuple[socket.socket, bool] | None:
+    """Return (socket, is_raw), preferring unprivileged datagram ICMP over raw sockets."""
+    try:
+        return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP), False
+    except OSError:
+        pass
+    try:
+        return socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP), True
+    except OSError:
+        return None
+
+
+def icmp_available() -> bool:
+    opened = open_icmp_socket()
+    if opened is None:
+        return False
+    opened[0].close()
+    return True
+
+
+def _parse_reply(packet: bytes, is_raw: bool) -> tuple[int, int] | None:
+    if is_raw:
+        # Raw sockets hand back the IPv4 header as well
+        packet = packet[(packet[0] & 0x0F) * 4:]
+    if len(packet) < 8:
+        return None
+    icmp_type, _code, _checksum_value, ident, seq = struct.unpack("!BBHHH", packet[:8])
+    if icmp_type != ICMP_ECHO_REPLY:
+        return None
+    return ident, seq
+
+
+def iter_icmp_echoes(
+    target: str,
+    count: int = 4,
+    interval_ms: float = 1000,
+    timeout_ms: float = 1000,
+) -> Iterator[tuple[int, float | None]]:
+    """Yield (index, rtt_ms) per echo, with rtt_ms None on timeout.
+
+    Sends follow a fixed schedule and replies are collected while later echoes are
+    in flight, so intervals well below the timeout work. Results arrive in completion
+    order, which is not necessarily send order.
+
+    Raises PermissionError when neither datagram nor raw ICMP sockets are allowed.
+    """
+    opened = open_icmp_socket()
+    if opened is None:
+        raise PermissionError("ICMP sockets are not permitted for this user")
+    sock, is_raw = opened
+    address = resolve(target)
+    ident = os.getpid() & 0xFFFF
+    interval_ns = int(interval_ms * 1_000_000)
+    timeout_ns = int(timeout_ms * 1_000_000)
+    # wire sequence -> (echo index, send timestamp), in send order
+    outstanding: dict[int, tuple[int, int]] = {}
+
+    with sock:
+        start_ns = time.perf_counter_ns()
+        sent = 0
+        while sent < count or outstanding:
+            now_ns = time.perf_counter_ns()
+
+            # Expire echoes whose reply window has closed, oldest first
+            for seq, (index, sent_ns) in list(outstanding.items()):
+                if now_ns - sent_ns < timeout_ns:
+                    break
+                del outstanding[seq]
+                yield index, None
+
+            if sent < count and now_ns >= start_ns + sent * interval_ns:
+                seq = sent & 0xFFFF
+                sent_ns = time.perf_counter_ns()
+                try:
+                    sock.sendto(_echo_request(ident, seq), (address, 0))
+                    outstanding[seq] = (sent, sent_ns)
+                except OSError:
+                    yield sent, None
+                sent += 1
+                continue
+
+            deadlines = []
+            if outstanding:
+                deadlines.append(next(iter(outstanding.values()))[1] + timeout_ns)
+            if sent < count:
+                deadlines.append(start_ns + sent * interval_ns)
+            readable, _, _ = select.select([sock], [], [], max(0, min(deadlines) - now_ns) / 1e9)
+            if not readable:
+                continue
+            packet = sock.recv(2048)
+            received_ns = time.perf_counter_ns()
+            reply = _parse_reply(packet, is_raw)
+            # Datagram ICMP sockets rewrite the identifier and only deliver our own
+            # replies, so the identifier is only meaningful on raw sockets.
+            if reply is None or (is_raw and reply[0] != ident) or reply[1] not in outstanding:
+                continue
+            index, sent_ns = outstanding.pop(reply[1])
+            yield index, (received_ns - sent_ns) / 1_000_000
+
+
+def icmp_ping(target: str, count: int = 4, interval_ms: float = 1000, timeout_ms: float = 1000) -> dict:
+    stats = PingStats()
+    for _seq, rtt in iter_icmp_echoes(target, count, interval_ms, timeout_ms):
+        if rtt is None:
+            stats.add_loss()
+        else:
+            stats.add(rtt)
+    return stats.summary(target, digits=3)
@@ -1,9 +1,10 @@
-import requests
 import datetime
 
+from http_session import get_session
+
 def run_ip_geolocation_test(logpath):
     try:
-        response = requests.get("http://ip-api.com/json", timeout=5)
+        response = get_session().get("http://ip-api.com/json", timeout=5)
         response.raise_for_status()
         data = response.json()
 
@@ -0,0 +1,147 @@
+import csv
+import ipaddress
+import json
+import mmap
+import os
+import socket
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from pathlib import Path
+
+from config import config
+
+
+_MAGIC = b"NDIPDB1\0"
+# magic, byte order ("l"/"b"), range count, record blob length
+_HEADER = struct.Struct("<8scxxxII")
+
+
+def _to_int(value: str) -> int:
+    value = value.strip()
+    return int(value) if value.isdigit() else int(ipaddress.IPv4Address(value))
+
+
+def compile_database(csv_path: str | Path, index_path: str | Path, columns: list[str]) -> int:
+    """Convert a start,end,... range CSV into the binary index IPRangeDatabase maps.
+
+    Start/end may be dotted IPv4 or integers; IPv6 rows are skipped. Identical
+    location records are stored once. Returns the number of ranges written.
+    """
+    rows = []
+    records: dict[tuple, int] = {}
+    with open(csv_path, newline="", encoding="utf-8") as handle:
+        for row in csv.reader(handle):
+            if len(row) < 2:
+                continue
+            try:
+                start, end = _to_int(row[0]), _to_int(row[1])
+            except ValueError:
+                # Header line or IPv6 range
+                continue
+            record = tuple(row[2:len(columns)])
+            rows.append((start, end, records.setdefault(record, len(records))))
+    rows.sort()
+
+    starts = array("I", (row[0] for row in rows))
+    ends = array("I", (row[1] for row in rows))
+    record_ids = array("I", (row[2] for row in rows))
+    blob = json.dumps({"Columns": columns[2:], "Records": list(records)}, separators=(",", ":")).encode()
+
+    index_path = Path(index_path)
+    tmp_path = index_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(_HEADER.pack(_MAGIC, sys.byteorder[0].encode(), len(rows), len(blob)))
+        for column in (starts, ends, record_ids):
+            column.tofile(handle)
+        handle.write(blob)
+    os.replace(tmp_path, index_path)
+    return len(rows)
+
+
+class IPRangeDatabase:
+    """Offline IPv4 geolocation from a sorted range index.
+
+    The start/end/record columns are memory-mapped straight from the index file
+    and searched with bisect, so a lookup is O(log n) and loading is near-instant.
+    """
+
+    def __init__(self, index_path: str | Path):
+        self._file = open(index_path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            # ValueError: mmap refuses an empty file
+            self._file.close()
+            raise ValueError(f"{index_path} is not a readable index: {exc}") from exc
+        try:
+            self._load(index_path)
+        except (KeyError, TypeError, struct.error) as exc:
+            # Malformed record blob or header: surface it like the other "not an index" errors
+            self.close()
+            raise ValueError(f"{index_path} is not a valid index: {exc}") from exc
+        except Exception:
+            self.close()
+            raise
+
+    def _load(self, index_path):
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f"{index_path} is too short to be an index; recompile it")
+        magic, byteorder, count, blob_length = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or byteorder != sys.byteorder[0].encode():
+            raise ValueError(f"{index_path} is not an index built for this machine; recompile it")
+        width = count * 4
+        offset = _HEADER.size
+        if len(self._map) < offset + 3 * width + blob_length:
+            raise ValueError(f"{index_path} is truncated; recompile it")
+        view = memoryview(self._map)
+        self._starts = view[offset:offset + width].cast("I")
+        self._ends = view[offset + width:offset + 2 * width].cast("I")
+        self._record_ids = view[offset + 2 * width:offset + 3 * width].cast("I")
+        blob = json.loads(bytes(view[offset + 3 * width:offset + 3 * width + blob_length]))
+        view.release()
+        self.columns = blob["Columns"]
+        self._records = blob["Records"]
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def close(self):
+        for attribute in ("_starts", "_ends", "_record_ids"):
+            if hasattr(self, attribute):
+                getattr(self, attribute).release()
+                delattr(self, attribute)
+        self._map.close()
+        self._file.close()
+
+    def lookup(self, ip: str) -> dict | None:
+        """Return {column: value} for the range containing ``ip``, or None."""
+        try:
+            value = int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+        except OSError:
+            return None
+        position = bisect_right(self._starts, value) - 1
+        if position < 0 or value > self._ends[position]:
+            return None
+        return dict(zip(self.columns, self._records[self._record_ids[position]]))
+
+    def lookup_many(self, ips: list[str]) -> dict[str, dict | None]:
+        return {ip: self.lookup(ip) for ip in dict.fromkeys(ips)}
+
+
+@lru_cache(maxsize=4)
+def open_database(path: str) -> IPRangeDatabase:
+    """Open ``path`` (a CSV or a compiled index) once per process.
+
+    A CSV is compiled to a sibling ``.idx`` file the first time and whenever it is
+    newer than that index.
+    """
+    source = Path(path)
+    if source.suffix.lower() != ".csv":
+        return IPRangeDatabase(source)
+    index = source.with_suffix(".idx")
+    if not index.exists() or index.stat().st_mtime < source.stat().st_mtime:
+        compile_database(source, index, config["Defaults"]["GeoDatabaseColumns"])
+    return IPRangeDatabase(index)
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from config import config
+
+
+class JSONCache:
+    """Small timestamped key/value cache kept in one JSON file under LogDirectory.
+
+    Every entry is a dict carrying a "Timestamp"; entries older than the TTL read
+    from config key ``ttl_key`` are ignored on read and dropped on every write, so
+    the file never grows without bound. Writes are atomic (temp file + rename) and
+    serialised across threads.
+    """
+
+    def __init__(self, filename: str, ttl_key: str, compact: bool = False):
+        self.filename = filename
+        self.ttl_key = ttl_key
+        # Compact files suit caches that can hold thousands of entries (e.g. hop addresses)
+        self._dump_options = {"separators": (",", ":")} if compact else {"indent": 2}
+        self._lock = threading.Lock()
+
+    def _path(self) -> Path:
+        return Path(config["Defaults"]["LogDirectory"]) / self.filename
+
+    def _ttl(self, ttl: float | None) -> float:
+        return config["Defaults"][self.ttl_key] if ttl is None else ttl
+
+    def _load(self) -> dict:
+        try:
+            with open(self._path(), encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, cache: dict):
+        path = self._path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False) as handle:
+            tmp_path = handle.name
+            json.dump(cache, handle, **self._dump_options)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+
+    def fresh(self, ttl: float | None = None) -> dict[str, dict]:
+        """Return every entry younger than ``ttl`` seconds (default: the configured TTL)."""
+        ttl = self._ttl(ttl)
+        now = time.time()
+        return {key: entry for key, entry in self._load().items() if now - entry.get("Timestamp", 0) <= ttl}
+
+    def get(self, key: str, ttl: float | None = None) -> dict | None:
+        """Return the entry for ``key`` if it is younger than ``ttl`` seconds, else None."""
+        entry = self._load().get(key)
+        if not entry or time.time() - entry.get("Timestamp", 0) > self._ttl(ttl):
+            return None
+        return entry
+
+    def store(self, entries: dict[str, dict]) -> bool:
+        """Timestamp and write ``entries`` in one update; returns False if the file could not be written."""
+        now = time.time()
+        with self._lock:
+            try:
+                cache = self.fresh()
+                cache.update({key: {**entry, "Timestamp": now} for key, entry in entries.items()})
+                self._save(cache)
+            except OSError:
+                return False
+        return True
@@ -0,0 +1,71 @@
+import math
+from array import array
+
+
+class LatencyHistogram:
+    """Fixed-size, log-bucketed latency histogram in the spirit of HdrHistogram.
+
+    Bucket i (i >= 1) covers (lowest * (1 + precision) ** (i - 1), lowest * (1 + precision) ** i],
+    bucket 0 holds everything at or below ``lowest_ms`` and values above ``highest_ms`` land in
+    the last bucket. Reported percentiles are the bucket's upper bound, so they are accurate to
+    within ``precision`` (1% by default) and never understate the tail.
+    """
+
+    def __init__(self, lowest_ms: float = 0.01, highest_ms: float = 60_000.0, precision: float = 0.01):
+        if lowest_ms <= 0 or highest_ms <= lowest_ms or precision <= 0:
+            raise ValueError("Histogram needs 0 < lowest_ms < highest_ms and a positive precision")
+        self.lowest_ms = lowest_ms
+        self.highest_ms = highest_ms
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self._counts = array("Q", bytes(8 * (self._index(highest_ms) + 1)))
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, value: float) -> int:
+        if value <= self.lowest_ms:
+            return 0
+        value = min(value, self.highest_ms)
+        return math.ceil(math.log(value / self.lowest_ms) / self._log_base)
+
+    def _upper_bound(self, index: int) -> float:
+        return self.lowest_ms * math.exp(index * self._log_base)
+
+    def record(self, value: float, count: int = 1):
+        self._counts[self._index(value)] += count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        if (other.lowest_ms, other.highest_ms, other.precision) != (self.lowest_ms, self.highest_ms, self.precision):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        for index, bucket_count in enumerate(other._counts):
+            if bucket_count:
+                self._counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(max(self._upper_bound(index), self.min), self.max)
+        return self.max
+
+    def percentiles(self, percents: tuple[float, ...] = (50, 90, 99, 99.9)) -> dict[float, float]:
+        return {percent: self.percentile(percent) for percent in percents}
@@ -0,0 +1,108 @@
+import heapq
+import random
+import threading
+import time
+from pathlib import Path
+
+from colorama import Fore
+
+from config import config
+from custom_logging import write_log_entry
+from run_bufferbloat_test import run_bufferbloat_test
+from run_ip_geolocation_test import run_ip_geolocation_test
+from run_ping_test import run_ping_test
+from run_traceroute_test import run_traceroute_test
+
+
+def _ping_probe(target: str, log_file: str):
+    summary = run_ping_test(target, log_path=log_file)
+    if summary:
+        write_log_entry(
+            (
+                f"[monitor] Ping {target}: {summary['AverageLatency']}ms avg, "
+                f"{summary['P99Latency']}ms p99, {summary['LossPercent']}% loss"
+            ),
+            log_file,
+            Fore.YELLOW,
+        )
+
+
+def _traceroute_probe(target: str, log_file: str):
+    hops = run_traceroute_test(target, log_file)
+    status = f"{len(hops)} hops" if hops else "failed"
+    write_log_entry(f"[monitor] Traceroute {target}: {status}", log_file, Fore.YELLOW)
+
+
+def _mtu_probe(target: str, log_file: str):
+    mtu = run_bufferbloat_test(target, log_path=log_file)
+    write_log_entry(f"[monitor] MTU {target}: {mtu or 'unknown'} bytes", log_file, Fore.YELLOW)
+
+
+def _geo_probe(_target: str, log_file: str):
+    summary = run_ip_geolocation_test(log_file)
+    if summary:
+        write_log_entry(
+            f"[monitor] GeoIP: {summary['IP']} {summary['City']}, {summary['Country']} (ISP: {summary['ISP']})",
+            log_file,
+            Fore.YELLOW,
+        )
+
+
+PROBES = {
+    "Ping": _ping_probe,
+    "Traceroute": _traceroute_probe,
+    "MTU": _mtu_probe,
+    "Geo": _geo_probe,
+}
+
+
+def run_monitor(
+    target: str,
+    log_path: str | None = None,
+    intervals: dict[str, float] | None = None,
+    jitter: float | None = None,
+    stop_event: threading.Event | None = None,
+):
+    """Run each probe on its own interval inside this process until stopped.
+
+    ``intervals`` maps probe names from PROBES to seconds; a falsy interval disables
+    that probe. First runs are spread over ``jitter`` * interval so probes don't all
+    fire together, and every later run is nudged by up to the same fraction.
+    """
+    defaults = config["Defaults"]
+    intervals = intervals or defaults["MonitorIntervals"]
+    jitter = defaults["MonitorJitter"] if jitter is None else jitter
+    stop_event = stop_event or threading.Event()
+    log_file = Path(log_path or Path(defaults["LogDirectory"]) / "monitor.log")
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
+    write_log_entry(f"--- Continuous Monitoring: {target} ---", str(log_file), Fore.CYAN)
+
+    now = time.monotonic()
+    queue: list[tuple[float, str]] = []
+    for name, interval in intervals.items():
+        if name not in PROBES:
+            write_log_entry(f"Unknown monitor probe '{name}' ignored.", str(log_file), Fore.RED)
+            continue
+        if interval:
+            write_log_entry(f"Scheduling {name} every {interval}s", str(log_file), Fore.LIGHTBLACK_EX)
+            heapq.heappush(queue, (now + random.uniform(0, interval * jitter), name))
+
+    try:
+        while queue:
+            due, name = heapq.heappop(queue)
+            if stop_event.wait(max(0.0, due - time.monotonic())):
+                break
+            try:
+                PROBES[name](target, str(log_file))
+            except Exception as exc:
+                write_log_entry(f"[monitor] {name} probe failed: {exc}", str(log_file), Fore.RED)
+
+            interval = intervals[name]
+            next_due = due + interval + random.uniform(-jitter, jitter) * interval
+            # A probe that overran its slot runs again immediately rather than trying to catch up
+            heapq.heappush(queue, (max(next_due, time.monotonic()), name))
+    except KeyboardInterrupt:
+        pass
+
+    write_log_entry("Monitoring stopped.", str(log_file), Fore.LIGHTBLACK_EX)
@@ -0,0 +1,15 @@
+from json_cache import JSONCache
+
+
+_cache = JSONCache("mtu_cache.json", "MTUCacheTTL")
+
+
+def get_cached_mtu(target: str, resolved_ip: str, ttl: float | None = None) -> int | None:
+    """Return the cached MTU for this target/IP pair if it is younger than ``ttl`` seconds."""
+    entry = _cache.get(f"{target}|{resolved_ip}", ttl)
+    return entry.get("MTU") if entry else None
+
+
+def store_mtu(target: str, resolved_ip: str, mtu: int) -> bool:
+    """Cache ``mtu`` for this target/IP pair; returns False if the cache file could not be written."""
+    return _cache.store({f"{target}|{resolved_ip}": {"Target": target, "IP": resolved_ip, "MTU": mtu}})
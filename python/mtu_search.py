@@ -0,0 +1,29 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+
+def bisect_mtu(probe: Callable[[int], bool], low: int, high: int, parallel: int = 1) -> int | None:
+    """Return the largest size in [low, high] for which ``probe(size)`` passes, or None.
+
+    Assumes a path MTU: every size up to it passes and every size above it fails. The top
+    of the range is tried first since most paths carry full-size packets. After that each
+    round probes ``parallel`` evenly spaced sizes inside the unresolved window, so one
+    probe per round is a plain bisection (about log2(high - low) probes in total).
+    """
+    if probe(high):
+        return high
+
+    # good: largest size known to pass (low - 1 until one does); bad: smallest size known to fail
+    good, bad = low - 1, high
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        while bad - good > 1:
+            span = bad - good
+            slots = min(max(1, parallel), span - 1)
+            sizes = sorted({good + (span * (i + 1)) // (slots + 1) for i in range(slots)})
+            results = list(pool.map(probe, sizes)) if len(sizes) > 1 else [probe(sizes[0])]
+            for size, ok in zip(sizes, results):
+                if ok:
+                    good = max(good, size)
+            bad = min([size for size, ok in zip(sizes, results) if not ok and size > good] + [bad])
+
+    return good if good >= low else None
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import argparse
 import datetime
 import os
 from pathlib import Path
@@ -9,11 +10,14 @@ from colorama import Fore, Style
 from config import config
 from custom_logging import write_log_entry
 from get_validated_int_input import get_validated_int
-from run_bufferbloat_test import run_bufferbloat_test
+from monitor_daemon import run_monitor
+from run_bufferbloat_test import run_bufferbloat_test, run_latency_under_load_test
+from run_dns_test import run_dns_test
 from run_ip_geolocation_test import run_ip_geolocation_test
-from run_ping_test import run_ping_test
+from run_ping_test import run_high_rate_ping_test, run_multi_ping_test, run_ping_test
 from run_speedtest import run_speed_test
-from run_traceroute_test import run_traceroute_test
+from run_traceroute_test import run_mtr_test, run_traceroute_test
+from test_scheduler import run_scheduled
 
 
 def _log_path(prefix: str) -> Path:
@@ -27,11 +31,24 @@ def _run_all_tests(target: str):
     log_file = _log_path("FullDiagnostics")
     write_log_entry(f"Running full diagnostics on {target}", str(log_file), Fore.CYAN)
 
-    geo_summary = run_ip_geolocation_test(str(log_file)) if config["Defaults"].get("EnableIPGeo", True) else None
-    ping_summary = run_ping_test(target, log_path=str(log_file))
-    traceroute_ok = run_traceroute_test(target, str(log_file))
-    buffer_result = run_bufferbloat_test(target, log_path=str(log_file))
-    speed_summary = run_speed_test(str(log_file))
+    # name: (test, resources it holds, exclusive); the speedtest saturates the link and so runs alone.
+    # Ping also holds the traceroute and MTU resources so their probe bursts toward the same target
+    # cannot skew its latency, jitter and loss; traceroute and MTU discovery may still overlap.
+    tests = {
+        "Geo": (lambda: run_ip_geolocation_test(str(log_file)), {"geo"}, False),
+        "Ping": (lambda: run_ping_test(target, log_path=str(log_file)), {"ping", "traceroute", "mtu"}, False),
+        "Traceroute": (lambda: run_traceroute_test(target, str(log_file)), {"traceroute"}, False),
+        "MTU": (lambda: run_bufferbloat_test(target, log_path=str(log_file)), {"mtu"}, False),
+        "Speedtest": (lambda: run_speed_test(str(log_file)), {"bandwidth"}, True),
+    }
+    if not config["Defaults"].get("EnableIPGeo", True):
+        del tests["Geo"]
+    results = run_scheduled(tests, str(log_file), parallel=config["Defaults"].get("RunAllParallel", True))
+    geo_summary = results.get("Geo")
+    ping_summary = results["Ping"]
+    hops = results["Traceroute"]
+    buffer_result = results["MTU"]
+    speed_summary = results["Speedtest"]
 
     write_log_entry("\n--- Summary Dashboard ---", str(log_file), Fore.CYAN)
     if geo_summary:
@@ -44,13 +61,18 @@ def _run_all_tests(target: str):
         write_log_entry(
             (
                 f"Ping to {ping_summary['Target']}: {ping_summary['AverageLatency']}ms avg, "
+                f"{ping_summary['P99Latency']}ms p99, "
                 f"{ping_summary['Jitter']}ms jitter, {ping_summary['LossPercent']}% loss"
             ),
             str(log_file),
             Fore.YELLOW,
         )
-    if traceroute_ok:
-        write_log_entry("Traceroute completed.", str(log_file), Fore.GREEN)
+    if hops:
+        write_log_entry(
+            f"Traceroute completed: {len(hops)} hops, last hop {hops[-1]['Address'] or '*'}",
+            str(log_file),
+            Fore.GREEN,
+        )
     if buffer_result:
         write_log_entry(f"MTU discovered: {buffer_result} bytes", str(log_file), Fore.GREEN)
     if speed_summary:
@@ -63,6 +85,14 @@ def _run_all_tests(target: str):
 
 def main():
     defaults = config["Defaults"]
+    parser = argparse.ArgumentParser(description="Network diagnostics suite")
+    parser.add_argument("--daemon", action="store_true", help="run scheduled probes continuously instead of the menu")
+    parser.add_argument("--target", default=defaults["TargetHost"], help="target host for daemon mode")
+    args = parser.parse_args()
+    if args.daemon:
+        run_monitor(args.target, log_path=str(_log_path("Monitor")))
+        return
+
     print(Fore.CYAN + "\n--- Network Diagnostics ---" + Style.RESET_ALL)
     print("1. Ping Test")
     print("2. Traceroute Test")
@@ -70,18 +100,25 @@ def main():
     print("4. Bufferbloat Test")
     print("5. IP Geolocation Test")
     print("6. Run All Tests")
-    print("7. Exit")
+    print("7. DNS Resolver Test")
+    print("8. High-Rate Ping Test")
+    print("9. MTR Test (repeated traceroute)")
+    print("10. Exit")
 
-    choice = get_validated_int("Enter your choice", default=7, min_value=1, max_value=7, label="menu choice")
-    if choice == 7:
+    choice = get_validated_int("Enter your choice", default=10, min_value=1, max_value=10, label="menu choice")
+    if choice == 10:
         print(Fore.LIGHTBLACK_EX + "Exiting diagnostics suite." + Style.RESET_ALL)
         return
 
-    target = input(f"Enter target host (default: {defaults['TargetHost']}): ").strip() or defaults["TargetHost"]
+    target = input(f"Enter target host, comma-separated for multi-target ping (default: {defaults['TargetHost']}): ").strip() or defaults["TargetHost"]
 
     if choice == 1:
         log_path = _log_path("Ping")
-        run_ping_test(target, log_path=str(log_path))
+        targets = [t.strip() for t in target.split(",") if t.strip()]
+        if len(targets) > 1:
+            run_multi_ping_test(targets, log_path=str(log_path))
+        else:
+            run_ping_test(target, log_path=str(log_path))
     elif choice == 2:
         log_path = _log_path("Traceroute")
         run_traceroute_test(target, str(log_path))
@@ -92,11 +129,21 @@ def main():
         log_path = _log_path("Bufferbloat")
         start_size = defaults["BufferStartSize"]
         run_bufferbloat_test(target, start_size=start_size, log_path=str(log_path))
+        run_latency_under_load_test(target, log_path=str(log_path))
     elif choice == 5:
         log_path = _log_path("IPGeo")
         run_ip_geolocation_test(str(log_path))
     elif choice == 6:
         _run_all_tests(target)
+    elif choice == 7:
+        log_path = _log_path("DNS")
+        run_dns_test(str(log_path))
+    elif choice == 8:
+        log_path = _log_path("HighRatePing")
+        run_high_rate_ping_test(target, log_path=str(log_path))
+    elif choice == 9:
+        log_path = _log_path("MTR")
+        run_mtr_test(target, log_path=str(log_path))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,157 @@
+import selectors
+import socket
+import struct
+import sys
+import time
+
+from dns_cache import resolve
+
+
+BASE_PORT = 33434
+ICMP_DEST_UNREACHABLE = 3
+ICMP_TIME_EXCEEDED = 11
+# Linux-only error queue; Python does not export IP_RECVERR, and option 11 means
+# something else (e.g. IP_MULTICAST_LOOP on macOS) elsewhere, so never use it off Linux
+ERROR_QUEUE_SUPPORTED = sys.platform.startswith("linux")
+IP_RECVERR = getattr(socket, "IP_RECVERR", 11)
+MSG_ERRQUEUE = getattr(socket, "MSG_ERRQUEUE", 0x2000)
+SO_EE_ORIGIN_ICMP = 2
+
+
+def _open_raw_listener() -> socket.socket | None:
+    try:
+        return socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+    except OSError:
+        return None
+
+
+def _parse_raw_reply(packet: bytes) -> tuple[int, int, str, int] | None:
+    """Return (icmp_type, icmp_code, inner_destination, inner_udp_port) for replies quoting a UDP probe."""
+    outer_len = (packet[0] & 0x0F) * 4
+    if len(packet) < outer_len + 8 + 20:
+        return None
+    icmp_type, icmp_code = packet[outer_len], packet[outer_len + 1]
+    if icmp_type not in (ICMP_TIME_EXCEEDED, ICMP_DEST_UNREACHABLE):
+        return None
+    inner = packet[outer_len + 8:]
+    inner_len = (inner[0] & 0x0F) * 4
+    if inner[9] != socket.IPPROTO_UDP or len(inner) < inner_len + 4:
+        return None
+    _src_port, dst_port = struct.unpack("!HH", inner[inner_len:inner_len + 4])
+    return icmp_type, icmp_code, socket.inet_ntoa(inner[16:20]), dst_port
+
+
+def _read_error_queue(sock: socket.socket) -> tuple[int, str] | None:
+    """Return (icmp_type, offender_address) from a probe socket's IP_RECVERR queue."""
+    try:
+        _data, ancdata, _flags, _addr = sock.recvmsg(512, 512, MSG_ERRQUEUE)
+    except (BlockingIOError, InterruptedError):
+        return None
+    for level, kind, data in ancdata:
+        if level != socket.IPPROTO_IP or kind != IP_RECVERR or len(data) < 16 + 8:
+            continue
+        _errno, origin, icmp_type, _code, _pad, _info, _data = struct.unpack("=IBBBBII", data[:16])
+        if origin != SO_EE_ORIGIN_ICMP:
+            continue
+        return icmp_type, socket.inet_ntoa(data[20:24])
+    return None
+
+
+def parallel_traceroute(
+    target: str,
+    max_hops: int = 30,
+    probes: int = 1,
+    timeout_ms: float = 2000,
+) -> list[dict]:
+    """Probe every TTL at once and return hop records ordered by TTL.
+
+    Each record is {"TTL", "Address", "Name", "RTTs"} with one RTT (ms, or None for no reply)
+    per probe. Replies are read from a raw ICMP socket when permitted, otherwise from
+    each probe socket's Linux IP_RECVERR queue. Raises PermissionError when neither
+    is available so callers can fall back to the system traceroute.
+    """
+    address = resolve(target)
+    listener = _open_raw_listener()
+    if listener is None and not ERROR_QUEUE_SUPPORTED:
+        raise PermissionError("Parallel traceroute needs raw ICMP sockets or Linux IP_RECVERR")
+
+    # One UDP socket per probe: the destination port (raw replies) or the socket itself
+    # (error queue) identifies which TTL and probe a reply belongs to.
+    probe_sockets: dict[int, tuple[socket.socket, int, int]] = {}
+    sent_at: dict[int, int] = {}
+    rtts = {ttl: [None] * probes for ttl in range(1, max_hops + 1)}
+    hop_address: dict[int, str] = {}
+    destination_ttl = None
+    # selectors rather than poll(), which Windows lacks; a queued socket error reads as EVENT_READ
+    selector = selectors.DefaultSelector()
+
+    try:
+        for probe in range(probes):
+            for ttl in range(1, max_hops + 1):
+                port = BASE_PORT + probe * max_hops + ttl - 1
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                sock.setblocking(False)
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+                if listener is None:
+                    try:
+                        sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+                    except OSError as exc:
+                        sock.close()
+                        raise PermissionError("Parallel traceroute needs raw ICMP sockets or Linux IP_RECVERR") from exc
+                probe_sockets[port] = (sock, ttl, probe)
+                sent_at[port] = time.perf_counter_ns()
+                try:
+                    sock.sendto(b"", (address, port))
+                except OSError:
+                    # Linux may surface an earlier ICMP error on send; the reply is still queued
+                    pass
+
+        if listener is not None:
+            selector.register(listener, selectors.EVENT_READ)
+        else:
+            for port, (sock, _ttl, _probe) in probe_sockets.items():
+                selector.register(sock, selectors.EVENT_READ, port)
+
+        deadline_ns = time.perf_counter_ns() + int(timeout_ms * 1_000_000)
+        pending = set(probe_sockets)
+        while pending:
+            remaining_ms = (deadline_ns - time.perf_counter_ns()) / 1_000_000
+            if remaining_ms <= 0:
+                break
+            events = selector.select(remaining_ms / 1000)
+            received_ns = time.perf_counter_ns()
+            for key, _mask in events:
+                if listener is not None:
+                    packet, (hop, _port) = listener.recvfrom(2048)
+                    reply = _parse_raw_reply(packet)
+                    if reply is None or reply[2] != address or reply[3] not in pending:
+                        continue
+                    icmp_type, port = reply[0], reply[3]
+                else:
+                    port = key.data
+                    reply = _read_error_queue(probe_sockets[port][0])
+                    selector.unregister(key.fileobj)
+                    if reply is None:
+                        continue
+                    icmp_type, hop = reply
+
+                pending.discard(port)
+                _sock, ttl, probe = probe_sockets[port]
+                hop_address.setdefault(ttl, hop)
+                rtts[ttl][probe] = (received_ns - sent_at[port]) / 1_000_000
+                if icmp_type == ICMP_DEST_UNREACHABLE and hop == address:
+                    destination_ttl = ttl if destination_ttl is None else min(destination_ttl, ttl)
+                    # Probes past the destination only produce duplicate answers from it
+                    pending = {p for p in pending if probe_sockets[p][1] <= destination_ttl}
+    finally:
+        selector.close()
+        if listener is not None:
+            listener.close()
+        for sock, _ttl, _probe in probe_sockets.values():
+            sock.close()
+
+    last_ttl = destination_ttl or max(hop_address, default=0)
+    return [
+        {"TTL": ttl, "Address": hop_address.get(ttl), "Name": None, "RTTs": rtts[ttl]}
+        for ttl in range(1, last_ttl + 1)
+    ]
@@ -0,0 +1,81 @@
+from latency_histogram import LatencyHistogram
+
+
+class PingStats:
+    """Running latency statistics that never keep the individual samples."""
+
+    def __init__(self, histogram: LatencyHistogram | None = None):
+        self.histogram = histogram or LatencyHistogram()
+        self.lost = 0
+        self.last = None
+        self._jitter_total = 0.0
+        self._jitter_count = 0
+
+    def add(self, latency: float):
+        if self.last is not None:
+            self._jitter_total += abs(latency - self.last)
+            self._jitter_count += 1
+        self.last = latency
+        self.histogram.record(latency)
+
+    def add_loss(self, count: int = 1):
+        self.lost += count
+
+    def merge(self, other: "PingStats"):
+        self.histogram.merge(other.histogram)
+        self.lost += other.lost
+        self._jitter_total += other._jitter_total
+        self._jitter_count += other._jitter_count
+
+    @property
+    def received(self) -> int:
+        return self.histogram.count
+
+    @property
+    def sent(self) -> int:
+        return self.received + self.lost
+
+    @property
+    def mean(self) -> float:
+        return self.histogram.mean
+
+    @property
+    def min(self) -> float | None:
+        return self.histogram.min
+
+    @property
+    def max(self) -> float | None:
+        return self.histogram.max
+
+    @property
+    def jitter(self) -> float:
+        return self._jitter_total / self._jitter_count if self._jitter_count else 0.0
+
+    @property
+    def loss_percent(self) -> float:
+        return round((self.lost / self.sent) * 100, 2) if self.sent else 0.0
+
+    def summary(self, target: str, sent: int | None = None, loss_percent: float | None = None, digits: int = 2) -> dict:
+        sent = self.sent if sent is None else sent
+        if loss_percent is None:
+            lost = max(0, sent - self.received)
+            loss_percent = round((lost / sent) * 100, 2) if sent else 0.0
+        else:
+            lost = int((loss_percent / 100) * sent)
+
+        p50, p90, p99, p999 = self.histogram.percentiles((50, 90, 99, 99.9)).values()
+        return {
+            "Target": target,
+            "Sent": sent,
+            "Received": sent - lost,
+            "Lost": lost,
+            "LossPercent": loss_percent,
+            "AverageLatency": round(self.mean, digits),
+            "Jitter": round(self.jitter, digits),
+            "MinLatency": round(self.min or 0.0, digits),
+            "MaxLatency": round(self.max or 0.0, digits),
+            "P50Latency": round(p50, digits),
+            "P90Latency": round(p90, digits),
+            "P99Latency": round(p99, digits),
+            "P999Latency": round(p999, digits),
+        }
@@ -0,0 +1,87 @@
+import asyncio
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from config import config
+
+
+# ip -> (name or None, expiry); shared by every traceroute in this process
+_cache: "OrderedDict[str, tuple[str | None, float]]" = OrderedDict()
+_lock = threading.Lock()
+# A long-lived pool, so asyncio.run() never waits on a lookup that already timed out
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="reverse-dns")
+
+
+def _cache_get(ip: str) -> tuple[bool, str | None]:
+    with _lock:
+        entry = _cache.get(ip)
+        if entry is None:
+            return False, None
+        if entry[1] < time.monotonic():
+            del _cache[ip]
+            return False, None
+        _cache.move_to_end(ip)
+        return True, entry[0]
+
+
+def _cache_put(ip: str, name: str | None, ttl: float):
+    defaults = config["Defaults"]
+    with _lock:
+        _cache[ip] = (name, time.monotonic() + ttl)
+        _cache.move_to_end(ip)
+        while len(_cache) > defaults["ReverseDNSCacheSize"]:
+            _cache.popitem(last=False)
+
+
+async def _lookup(loop: asyncio.AbstractEventLoop, ip: str, timeout: float) -> tuple[str | None, bool]:
+    """Return (name or None, definitive); only answers and NXDOMAIN are definitive."""
+    try:
+        lookup = loop.run_in_executor(_executor, socket.getnameinfo, (ip, 0), socket.NI_NAMEREQD)
+        host, _port = await asyncio.wait_for(lookup, timeout)
+        return host, True
+    except socket.gaierror as exc:
+        return None, exc.errno == socket.EAI_NONAME
+    except (asyncio.TimeoutError, OSError):
+        return None, False
+
+
+async def _lookup_all(ips: list[str], timeout: float) -> list[tuple[str | None, bool]]:
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(_lookup(loop, ip, timeout) for ip in ips))
+
+
+def resolve_names(ips: list[str | None]) -> dict[str, str | None]:
+    """Reverse-resolve every distinct IP concurrently.
+
+    Names and NXDOMAIN answers are cached for ReverseDNSTTL; timeouts and other
+    transient failures only for DNSNegativeTTL, so a slow resolver does not hide
+    hop names for the whole hour.
+    """
+    names: dict[str, str | None] = {}
+    misses = []
+    for ip in dict.fromkeys(ip for ip in ips if ip):
+        hit, name = _cache_get(ip)
+        if hit:
+            names[ip] = name
+        else:
+            misses.append(ip)
+
+    if misses:
+        defaults = config["Defaults"]
+        results = asyncio.run(_lookup_all(misses, defaults["ReverseDNSTimeout"]))
+        for ip, (name, definitive) in zip(misses, results):
+            _cache_put(ip, name, defaults["ReverseDNSTTL"] if definitive else defaults["DNSNegativeTTL"])
+            names[ip] = name
+    return names
+
+
+def annotate_hops(hops: list[dict]) -> list[dict]:
+    """Fill in each hop record's Name from a single batched reverse lookup."""
+    names = resolve_names([hop.get("Address") for hop in hops])
+    for hop in hops:
+        if hop.get("Address"):
+            hop["Name"] = names.get(hop["Address"]) or hop.get("Name")
+    return hops
@@ -1,88 +1,242 @@
 import platform
 import subprocess
+import threading
+import time
 from pathlib import Path
 
+import requests
 from colorama import Fore, Style
 
 from config import config
-from custom_logging import write_log_entry
+from custom_logging import open_log, write_log_entry
+from dns_cache import resolve
+from http_session import get_session
+from icmp_ping import icmp_available, iter_icmp_echoes
+from mtu_cache import get_cached_mtu, store_mtu
+from mtu_search import bisect_mtu
+from ping_stats import PingStats
+from tcp_ping import tcp_connect_samples
 
 
-def _build_ping_args(target: str, size: int) -> list[str]:
+def _build_ping_args(target: str, size: int, timeout_s: int) -> list[str]:
     system = platform.system().lower()
     if system == "windows":
-        return ["ping", target, "-f", "-l", str(size), "-n", "1"]
+        return ["ping", target, "-f", "-l", str(size), "-n", "1", "-w", str(timeout_s * 1000)]
     # Linux and macOS
     payload = max(0, size - 28)
     args = ["ping", "-c", "1", "-s", str(payload), target]
     # Linux supports -M do; macOS will ignore the flag
     if system == "linux":
-        args.insert(3, "-M")
-        args.insert(4, "do")
+        args[3:3] = ["-M", "do", "-W", str(timeout_s)]
     return args
 
 
+_FRAGMENTATION_PHRASES = [
+    "Packet needs to be fragmented",
+    "message too long",
+    "Frag needed",
+    "DF set",
+]
+
+
 def run_bufferbloat_test(target: str, start_size: int | None = None, log_path: str | None = None):
     defaults = config["Defaults"]
-    packet_size = start_size or defaults["BufferStartSize"]
+    max_size = start_size or defaults["BufferStartSize"]
     min_size = defaults["MTUStopSize"]
-    step = defaults["MTUDecrement"]
+    timeout_s = defaults["MTUProbeTimeout"]
 
     log_file = Path(log_path or Path(defaults["LogDirectory"]) / "bufferbloat.log")
     log_file.parent.mkdir(parents=True, exist_ok=True)
 
     write_log_entry("--- Bufferbloat / MTU Discovery ---", str(log_file), Fore.CYAN)
-    write_log_entry(f"Target: {target}", str(log_file), Fore.GRAY)
+    write_log_entry(f"Target: {target}", str(log_file), Fore.LIGHTBLACK_EX)
+
+    try:
+        resolved_ip = resolve(target)
+    except OSError:
+        resolved_ip = None
+
+    def probe(packet_size: int) -> bool:
+        # Only an explicit frag-needed / message-too-long answer proves the size too big. A lost
+        # reply or timeout is retried first: bisection treats a failure as a hard upper bound.
+        for attempt in range(1 + defaults["MTUProbeRetries"]):
+            write_log_entry(f"Testing with packet size: {packet_size} bytes", str(log_file), Fore.YELLOW)
+            cmd = _build_ping_args(resolved_ip or target, packet_size, timeout_s)
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_s + 1)
+            except subprocess.TimeoutExpired:
+                write_log_entry(f"Timeout at {packet_size} bytes", str(log_file), Fore.YELLOW)
+                continue
+
+            output = (result.stdout or "") + (result.stderr or "")
+            with open_log(log_file) as handle:
+                handle.write(output + "\n")
+
+            if any(phrase.lower() in output.lower() for phrase in _FRAGMENTATION_PHRASES):
+                write_log_entry(f"Fragmentation detected at {packet_size} bytes.", str(log_file), Fore.RED)
+                return False
+            if result.returncode == 0:
+                write_log_entry(f"Non-fragmented response at {packet_size} bytes.", str(log_file), Fore.GREEN)
+                return True
+            write_log_entry(f"No reply at {packet_size} bytes.", str(log_file), Fore.YELLOW)
+
+        write_log_entry(
+            f"No reply at {packet_size} bytes after {attempt + 1} attempts; treating it as too large.",
+            str(log_file),
+            Fore.RED,
+        )
+        return False
+
+    try:
+        cached = get_cached_mtu(target, resolved_ip) if resolved_ip else None
+        if cached and cached <= max_size:
+            write_log_entry(f"Confirming cached MTU of {cached} bytes for {resolved_ip}", str(log_file), Fore.LIGHTBLACK_EX)
+            if probe(cached):
+                print(Fore.GREEN + f"Maximum non-fragmented packet size: {cached} bytes (cached)" + Style.RESET_ALL)
+                return cached
+            write_log_entry("Cached MTU no longer passes; running a full search.", str(log_file), Fore.YELLOW)
+        packet_size = bisect_mtu(probe, min_size, max_size, parallel=defaults["MTUParallelProbes"])
+    except FileNotFoundError:
+        write_log_entry("Ping command not available for MTU discovery.", str(log_file), Fore.RED)
+        return False
+
+    if packet_size is not None and resolved_ip:
+        store_mtu(target, resolved_ip, packet_size)
+
+    if packet_size is None:
+        write_log_entry(
+            f"Unable to find non-fragmented size above {min_size} bytes.",
+            str(log_file),
+            Fore.RED,
+        )
+        return None
+
+    print(Fore.GREEN + f"Maximum non-fragmented packet size: {packet_size} bytes" + Style.RESET_ALL)
+    return packet_size
+
+
+# Added latency under load (ms) -> grade, following the usual bufferbloat grading bands
+_GRADE_BANDS = [(5, "A+"), (30, "A"), (60, "B"), (200, "C"), (400, "D")]
+_LOAD_CHUNK = 64 * 1024
+
 
-    while packet_size >= min_size:
-        write_log_entry(f"Testing with packet size: {packet_size} bytes", str(log_file), Fore.YELLOW)
-        cmd = _build_ping_args(target, packet_size)
+def _grade(inflation_ms: float) -> str:
+    return next((grade for limit, grade in _GRADE_BANDS if inflation_ms < limit), "F")
 
+
+def _sample_latency(target: str, duration_s: float, interval_ms: float) -> PingStats:
+    stats = PingStats()
+    count = max(1, int(duration_s * 1000 / interval_ms))
+    if icmp_available():
+        samples = (rtt for _index, rtt in iter_icmp_echoes(target, count, interval_ms, timeout_ms=1000))
+    else:
+        samples = tcp_connect_samples(target, count=count, interval_ms=interval_ms)
+    for rtt in samples:
+        if rtt is None:
+            stats.add_loss()
+        else:
+            stats.add(rtt)
+    return stats
+
+
+def _download_worker(url: str, stop: threading.Event, totals: list[int], slot: int):
+    while not stop.is_set():
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-        except FileNotFoundError:
-            write_log_entry("Ping command not available for MTU discovery.", str(log_file), Fore.RED)
-            return False
-        except subprocess.TimeoutExpired:
-            write_log_entry(f"Timeout at {packet_size} bytes", str(log_file), Fore.RED)
-            packet_size -= step
-            continue
-
-        output = (result.stdout or "") + (result.stderr or "")
-        with open(log_file, "a", encoding="utf-8") as handle:
-            handle.write(output + "\n")
-
-        fragmented = any(
-            phrase in output
-            for phrase in [
-                "Packet needs to be fragmented",
-                "message too long",
-                "Frag needed",
-                "DF set",
-            ]
-        )
+            with get_session().get(url, stream=True, timeout=10) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(_LOAD_CHUNK):
+                    totals[slot] += len(chunk)
+                    if stop.is_set():
+                        return
+        except requests.RequestException:
+            stop.wait(0.5)
 
-        if fragmented or result.returncode != 0:
-            write_log_entry(
-                f"Fragmentation detected at {packet_size} bytes. Reducing size...",
-                str(log_file),
-                Fore.RED,
-            )
-            packet_size -= step
-            continue
 
+def _upload_worker(url: str, stop: threading.Event, totals: list[int], slot: int):
+    payload = bytes(_LOAD_CHUNK)
+
+    def body():
+        while not stop.is_set():
+            totals[slot] += len(payload)
+            yield payload
+
+    while not stop.is_set():
+        try:
+            get_session().post(url, data=body(), timeout=10).close()
+        except requests.RequestException:
+            stop.wait(0.5)
+
+
+def _loaded_phase(target: str, worker, url: str, streams: int, duration_s: float, interval_ms: float):
+    stop = threading.Event()
+    totals = [0] * streams
+    threads = [threading.Thread(target=worker, args=(url, stop, totals, slot), daemon=True) for slot in range(streams)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    # Let the streams ramp up and fill the queue before sampling
+    time.sleep(min(1.0, duration_s / 4))
+    stats = _sample_latency(target, duration_s, interval_ms)
+    stop.set()
+    elapsed = time.perf_counter() - started
+    for thread in threads:
+        thread.join(timeout=5)
+    return stats, round(sum(totals) * 8 / elapsed / 1_000_000, 2)
+
+
+def run_latency_under_load_test(
+    target: str,
+    log_path: str | None = None,
+    download_url: str | None = None,
+    upload_url: str | None = None,
+    duration_s: float | None = None,
+    streams: int | None = None,
+):
+    """Measure how much RTT to ``target`` inflates while the link is saturated in each direction."""
+    defaults = config["Defaults"]
+    download_url = download_url or defaults["BufferbloatDownloadURL"]
+    upload_url = upload_url or defaults["BufferbloatUploadURL"]
+    duration_s = duration_s or defaults["BufferbloatDuration"]
+    streams = streams or defaults["BufferbloatStreams"]
+    interval_ms = defaults["BufferbloatSampleInterval"]
+
+    log_file = Path(log_path or Path(defaults["LogDirectory"]) / "bufferbloat.log")
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
+    write_log_entry("--- Bufferbloat / Latency Under Load ---", str(log_file), Fore.CYAN)
+    write_log_entry(f"Measuring idle latency to {target}...", str(log_file), Fore.LIGHTBLACK_EX)
+    try:
+        idle = _sample_latency(target, duration_s, interval_ms)
+    except OSError as exc:
+        write_log_entry(f"Latency sampling failed: {exc}", str(log_file), Fore.RED)
+        return None
+    if not idle.received:
+        write_log_entry(f"No replies from {target}; cannot measure bufferbloat.", str(log_file), Fore.RED)
+        return None
+    write_log_entry(f"Idle latency: {idle.mean:.2f}ms avg, {idle.jitter:.2f}ms jitter", str(log_file), Fore.GREEN)
+
+    summary = {"Target": target, "IdleLatency": round(idle.mean, 2)}
+    for direction, worker, url in (
+        ("Download", _download_worker, download_url),
+        ("Upload", _upload_worker, upload_url),
+    ):
+        write_log_entry(f"Saturating {direction.lower()} with {streams} streams...", str(log_file), Fore.LIGHTBLACK_EX)
+        loaded, mbps = _loaded_phase(target, worker, url, streams, duration_s, interval_ms)
+        inflation = max(0.0, loaded.mean - idle.mean) if loaded.received else float("inf")
+        grade = _grade(inflation)
+        summary[f"{direction}Latency"] = round(loaded.mean, 2)
+        summary[f"{direction}P99Latency"] = round(loaded.histogram.percentile(99), 2)
+        summary[f"{direction}LossPercent"] = loaded.loss_percent
+        summary[f"{direction}Inflation"] = round(inflation, 2)
+        summary[f"{direction}Grade"] = grade
+        summary[f"{direction}Mbps"] = mbps
         write_log_entry(
-            f"Non-fragmented response at {packet_size} bytes. Bufferbloat unlikely at this size.",
+            (
+                f"{direction}: {mbps} Mbps, latency {loaded.mean:.2f}ms avg "
+                f"(+{inflation:.2f}ms), {loaded.loss_percent}% loss, grade {grade}"
+            ),
             str(log_file),
-            Fore.GREEN,
+            Fore.GREEN if grade.startswith("A") else Fore.YELLOW if grade in ("B", "C") else Fore.RED,
         )
-        print(Fore.GREEN + f"Maximum non-fragmented packet size: {packet_size} bytes" + Style.RESET_ALL)
-        return packet_size
-
-    write_log_entry(
-        f"Unable to find non-fragmented size above {min_size} bytes.",
-        str(log_file),
-        Fore.RED,
-    )
-    return None
 
+    return summary
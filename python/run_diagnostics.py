@@ -4,7 +4,6 @@ import subprocess
 import datetime
 import platform
 import shutil
-import socket
 
 # Defensive imports
 try:
@@ -31,7 +30,14 @@ init(autoreset=True)
 from config import config
 from ip_geolocation import run_ip_geolocation_test
 from get_validated_int_input import get_validated_int
-from custom_logging import write_log_entry
+from custom_logging import open_log, write_log_entry
+from dns_cache import resolve, resolve_or_host
+from mtu_cache import get_cached_mtu, store_mtu
+from mtu_search import bisect_mtu
+from parallel_traceroute import parallel_traceroute
+from reverse_dns import annotate_hops
+from run_traceroute_test import format_hop
+from tcp_ping import tcp_ping
 
 # ----------------------------
 # Utility
@@ -50,21 +56,22 @@ def is_command_available(cmd):
 # Tests
 # ----------------------------
 def run_ping_test(target, count, delay_ms, logpath, verbose=True):
-    delay_sec = max(1, delay_ms // 1000)
+    delay_sec = f"{delay_ms / 1000:g}"
     system = platform.system().lower()
 
+    host = resolve_or_host(target)
     if system == "windows":
-        cmd = ["ping", target, "-n", str(count), "-w", str(delay_ms)]
+        cmd = ["ping", host, "-n", str(count), "-w", str(delay_ms)]
     else:
-        cmd = ["ping", "-c", str(count), "-i", str(delay_sec), target]
+        cmd = ["ping", "-c", str(count), "-i", delay_sec, host]
 
     if not is_command_available("ping"):
         try:
-            r = requests.get(f"http://{target}", timeout=3)
-            write_log_entry(f"Ping fallback: HTTP status {r.status_code}", logpath)
-            return {"Target": target, "AverageLatency": 0, "Jitter": 0, "LossPercent": 0}
+            summary = tcp_ping(target, count=count)
+            write_log_entry(f"Ping fallback: TCP connect to port {summary['Port']}, {summary['AverageLatency']}ms avg", logpath)
+            return summary
         except Exception as e:
-            write_log_entry(f"Ping not available. HTTP fallback failed: {e}", logpath)
+            write_log_entry(f"Ping not available. TCP fallback failed: {e}", logpath)
             return None
 
     try:
@@ -72,7 +79,7 @@ def run_ping_test(target, count, delay_ms, logpath, verbose=True):
         output = result.stdout
 
         # Log to file
-        with open(logpath, "a", encoding="utf-8") as f:
+        with open_log(logpath) as f:
             f.write("\n--- Ping Test ---\n")
             f.write(output + "\n")
 
@@ -118,7 +125,7 @@ def run_traceroute_test(target, logpath, verbose=True):
 
     # Resolve domain to IP
     try:
-        resolved_ip = socket.gethostbyname(target)
+        resolved_ip = resolve(target)
     except Exception as e:
         msg = f"DNS resolution failed: {e}"
         write_log_entry(msg, logpath)
@@ -126,6 +133,28 @@ def run_traceroute_test(target, logpath, verbose=True):
             print(Fore.RED + msg + Style.RESET_ALL)
         return False
 
+    # Prefer the in-process engine, which probes every TTL at once
+    if config["Defaults"]["TracerouteEngine"] == "parallel":
+        try:
+            hops = parallel_traceroute(
+                resolved_ip,
+                max_hops=config["Defaults"]["TracerouteMaxHops"],
+                probes=config["Defaults"]["TracerouteProbes"],
+                timeout_ms=config["Defaults"]["TracerouteTimeout"],
+            )
+            if verbose:
+                print(Fore.LIGHTBLACK_EX + "\n--- Traceroute Results ---" + Style.RESET_ALL)
+            with open_log(logpath) as f:
+                f.write("\n--- Traceroute Test ---\n")
+                for hop in annotate_hops(hops):
+                    line = format_hop(hop)
+                    f.write(line + "\n")
+                    if verbose:
+                        print(line)
+            return bool(hops)
+        except OSError as e:
+            write_log_entry(f"Parallel traceroute unavailable ({e}); using system traceroute.", logpath)
+
     # Choose command
     cmd = ["tracert", resolved_ip] if system == "windows" else ["traceroute", resolved_ip]
 
@@ -144,7 +173,7 @@ def run_traceroute_test(target, logpath, verbose=True):
         if verbose:
             print(Fore.LIGHTBLACK_EX + "\n--- Traceroute Results ---" + Style.RESET_ALL)
 
-        with open(logpath, "a", encoding="utf-8") as f:
+        with open_log(logpath) as f:
             f.write("\n--- Traceroute Test ---\n")
 
             # Stream output line by line
@@ -187,7 +216,7 @@ def run_speed_test(logpath):
             "Server": server,
             "ISP": isp,
         }
-        with open(logpath, "a", encoding="utf-8") as f:
+        with open_log(logpath) as f:
             f.write(str(summary) + "\n")
         return summary
     except Exception as e:
@@ -207,15 +236,11 @@ def run_bufferbloat_test(target, start_size, logpath, verbose=True):
     print(Fore.LIGHTBLUE_EX + "\n--- Bufferbloat MTU Discovery ---" + Style.RESET_ALL)
     write_log_entry(f"Starting bufferbloat test to {target} with DF flag", logpath)
 
-    size = start_size
-    mtu_found = False
-    final_mtu = None
-
-    with open(logpath, "a", encoding="utf-8") as f:
+    with open_log(logpath) as f:
         f.write("\n--- Bufferbloat MTU Discovery ---\n")
 
-        while size > 0:
-            cmd = ["ping", target, "-f", "-l", str(size), "-n", "1"]
+        def probe(size):
+            cmd = ["ping", resolve_or_host(target), "-f", "-l", str(size), "-n", "1", "-w", "2000"]
             try:
                 result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
                 output = result.stdout + result.stderr
@@ -225,34 +250,36 @@ def run_bufferbloat_test(target, start_size, logpath, verbose=True):
                     print(Fore.LIGHTBLACK_EX + f"Testing size: {size}" + Style.RESET_ALL)
                     print(output.strip())
 
-                if "Packet needs to be fragmented but DF set." in output:
-                    size -= 20
-                    continue
-                else:
-                    mtu_found = True
-                    final_mtu = size
-                    break
+                return "Packet needs to be fragmented but DF set." not in output
 
             except subprocess.TimeoutExpired:
                 f.write(f"\nTimeout at size {size}\n")
                 if verbose:
                     print(Fore.RED + f"Timeout at size {size}" + Style.RESET_ALL)
-                size -= 20
             except Exception as e:
                 f.write(f"\nError at size {size}: {e}\n")
                 if verbose:
                     print(Fore.RED + f"Error at size {size}: {e}" + Style.RESET_ALL)
-                size -= 20
+            return False
+
+        try:
+            cached = get_cached_mtu(target, resolve(target))
+        except OSError:
+            cached = None
+        if cached and cached <= start_size and probe(cached):
+            final_mtu = cached
+        else:
+            final_mtu = bisect_mtu(probe, config["Defaults"]["MTUStopSize"], start_size)
+        mtu_found = final_mtu is not None
 
     if mtu_found:
         msg = f"Maximum non-fragmented packet size: {final_mtu} bytes"
         write_log_entry(msg, logpath)
         print(Fore.GREEN + msg + Style.RESET_ALL)
 
-        # Optional: persist to config or external file
+        # Persist to the shared MTU cache under LogDirectory
         try:
-            with open("mtu_result.txt", "w") as mtu_file:
-                mtu_file.write(f"MTU discovered for {target}: {final_mtu} bytes\n")
+            store_mtu(target, resolve(target), final_mtu)
         except Exception as e:
             print(Fore.RED + f"Failed to write MTU result: {e}" + Style.RESET_ALL)
 
@@ -301,7 +328,7 @@ def run_all_tests(target, logpath):
 
     # Summary Dashboard
     print(Fore.CYAN + "\n--- Summary Dashboard ---" + Style.RESET_ALL)
-    with open(logpath, "a", encoding="utf-8") as f:
+    with open_log(logpath) as f:
         f.write("\n--- Summary Dashboard ---\n")
 
         if geo_summary:
@@ -0,0 +1,144 @@
+import asyncio
+from pathlib import Path
+
+from colorama import Fore, Style
+
+from config import config
+from custom_logging import open_log, write_log_entry
+from dns_client import RCODE_NAMES, DNSClient
+from dns_standin import start_dns_standin
+from latency_histogram import LatencyHistogram
+
+
+def _system_resolvers() -> list[str]:
+    try:
+        with open("/etc/resolv.conf", encoding="utf-8") as handle:
+            return [
+                parts[1]
+                for parts in (line.split() for line in handle)
+                if len(parts) >= 2 and parts[0] == "nameserver"
+            ]
+    except OSError:
+        return []
+
+
+def _split_resolver(entry: str) -> tuple[str, int]:
+    # "1.1.1.1" or "127.0.0.1:5353"; bare IPv6 addresses keep the default port
+    if entry.count(":") == 1:
+        host, port = entry.split(":")
+        return host, int(port)
+    return entry, 53
+
+
+async def _benchmark_resolver(label: str, entry: str, names: list[str], repeats: int, timeout: float) -> dict:
+    host, port = _split_resolver(entry)
+    uncached = LatencyHistogram()
+    cached = LatencyHistogram()
+    failures: dict[str, int] = {}
+    queries = 0
+
+    try:
+        async with DNSClient(host, port, timeout) as client:
+            # The first pass over each name is treated as a cache miss, the repeats as hits
+            for round_index in range(repeats + 1):
+                results = await asyncio.gather(*(client.query(name) for name in names))
+                for latency, rcode, _addresses in results:
+                    queries += 1
+                    if latency is None or rcode != 0:
+                        reason = "TIMEOUT" if rcode is None else RCODE_NAMES.get(rcode, str(rcode))
+                        failures[reason] = failures.get(reason, 0) + 1
+                        continue
+                    (uncached if round_index == 0 else cached).record(latency)
+    except OSError as exc:
+        # Unreachable resolver (e.g. unscoped link-local or IPv6 without a route): every query fails
+        unsent = len(names) * (repeats + 1) - queries
+        queries += unsent
+        reason = exc.strerror or str(exc)
+        failures[reason] = failures.get(reason, 0) + unsent
+
+    failed = sum(failures.values())
+    return {
+        "Resolver": label,
+        "Queries": queries,
+        "Failures": failed,
+        "FailurePercent": round(failed / queries * 100, 2) if queries else 0.0,
+        "FailureReasons": failures,
+        "UncachedP50": _percentile(uncached, 50),
+        "UncachedP90": _percentile(uncached, 90),
+        "UncachedP99": _percentile(uncached, 99),
+        "CachedP50": _percentile(cached, 50),
+        "CachedP90": _percentile(cached, 90),
+        "CachedP99": _percentile(cached, 99),
+    }
+
+
+def _percentile(histogram: LatencyHistogram, percent: float) -> float | None:
+    # None rather than 0.0 so a resolver that never answered cannot look like the fastest
+    return round(histogram.percentile(percent), 2) if histogram.count else None
+
+
+def _ms(value: float | None) -> str:
+    return "-" if value is None else str(value)
+
+
+async def _benchmark_all(resolvers: dict[str, str], names: list[str], repeats: int, timeout: float) -> list[dict]:
+    return await asyncio.gather(
+        *(_benchmark_resolver(label, entry, names, repeats, timeout) for label, entry in resolvers.items())
+    )
+
+
+def run_dns_test(
+    log_path: str | None = None,
+    resolvers: list[str] | None = None,
+    names: list[str] | None = None,
+    repeats: int | None = None,
+    include_standin: bool | None = None,
+):
+    defaults = config["Defaults"]
+    names = names or defaults["DNSTestNames"]
+    repeats = defaults["DNSTestRepeats"] if repeats is None else repeats
+    include_standin = defaults["DNSIncludeStandin"] if include_standin is None else include_standin
+    log_file = Path(log_path or Path(defaults["LogDirectory"]) / "dns.log")
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
+    write_log_entry("--- DNS Resolver Test ---", str(log_file), Fore.CYAN)
+
+    targets = {f"System ({server})": server for server in _system_resolvers()}
+    targets.update({server: server for server in resolvers or defaults["DNSResolvers"]})
+    standin = None
+    if include_standin:
+        standin, address = start_dns_standin()
+        targets[f"Local stand-in ({address})"] = address
+    if not targets:
+        write_log_entry("No DNS resolvers to test.", str(log_file), Fore.RED)
+        return None
+
+    write_log_entry(
+        f"Querying {len(names)} names against {len(targets)} resolvers ({repeats} cached repeats)...",
+        str(log_file),
+        Fore.LIGHTBLACK_EX,
+    )
+    try:
+        results = asyncio.run(_benchmark_all(targets, names, repeats, defaults["DNSTestTimeout"]))
+    finally:
+        if standin:
+            standin.shutdown()
+
+    # Rows without any uncached answer sort last
+    results.sort(key=lambda r: (r["UncachedP50"] is None, r["FailurePercent"], r["UncachedP50"] or 0.0))
+    header = f"{'Resolver':<32} {'Uncached p50/p90/p99 ms':>26} {'Cached p50/p90/p99 ms':>24} {'Fail%':>6}"
+    print(Fore.CYAN + header + Style.RESET_ALL)
+    with open_log(log_file) as handle:
+        handle.write(header + "\n")
+        for result in results:
+            line = (
+                f"{result['Resolver']:<32} "
+                f"{_ms(result['UncachedP50']):>8}/{_ms(result['UncachedP90'])}/{_ms(result['UncachedP99']):<8} "
+                f"{_ms(result['CachedP50']):>8}/{_ms(result['CachedP90'])}/{_ms(result['CachedP99']):<8} "
+                f"{result['FailurePercent']:>6}"
+            )
+            if result["FailureReasons"]:
+                line += "  " + ", ".join(f"{reason} x{count}" for reason, count in result["FailureReasons"].items())
+            handle.write(line + "\n")
+            print((Fore.RED if result["Failures"] else Fore.LIGHTBLACK_EX) + line + Style.RESET_ALL)
+    return results
@@ -1,10 +1,14 @@
+import ipaddress
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-import requests
 from colorama import Fore
 
 from config import config
 from custom_logging import write_log_entry
+from geo_cache import geo_summary, get_cached_geo, store_geo
+from http_session import get_session
+from ip_range_db import open_database
 
 
 FALLBACK_IP_ENDPOINTS = [
@@ -14,21 +18,51 @@ FALLBACK_IP_ENDPOINTS = [
 ]
 
 
+def _fetch_external_ip(url: str) -> str:
+    response = get_session().get(url, timeout=5)
+    response.raise_for_status()
+    data = response.json() if "json" in response.headers.get("Content-Type", "") else response.text
+    ip_value = str((data.get("ip") if isinstance(data, dict) else data) or "").strip()
+    # Raises ValueError for captive-portal pages and other junk answers
+    ipaddress.ip_address(ip_value)
+    return ip_value
+
+
 def _resolve_external_ip(log_file: Path) -> str | None:
-    for url in FALLBACK_IP_ENDPOINTS:
-        try:
-            response = requests.get(url, timeout=5)
-            response.raise_for_status()
-            data = response.json() if "json" in response.headers.get("Content-Type", "") else response.text
-            ip_value = data.get("ip") if isinstance(data, dict) else data
-            if ip_value:
-                write_log_entry(f"Detected external IP: {ip_value}", str(log_file), Fore.GREEN)
-                return str(ip_value).strip()
-        except Exception as exc:
-            write_log_entry(f"Failed to retrieve IP from {url}: {exc}", str(log_file), Fore.YELLOW)
+    """Query every endpoint at once and return the first valid address.
+
+    Slower requests are abandoned rather than awaited, so the lookup takes about as
+    long as the fastest endpoint.
+    """
+    pool = ThreadPoolExecutor(max_workers=len(FALLBACK_IP_ENDPOINTS))
+    futures = {pool.submit(_fetch_external_ip, url): url for url in FALLBACK_IP_ENDPOINTS}
+    try:
+        for future in as_completed(futures):
+            try:
+                ip_value = future.result()
+            except Exception as exc:
+                write_log_entry(f"Failed to retrieve IP from {futures[future]}: {exc}", str(log_file), Fore.YELLOW)
+                continue
+            write_log_entry(f"Detected external IP: {ip_value}", str(log_file), Fore.GREEN)
+            return ip_value
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
     return None
 
 
+def _log_summary(summary: dict, log_file: Path):
+    details = ", ".join(
+        [
+            f"ISP: {summary['ISP']}",
+            f"City: {summary['City']}",
+            f"Region: {summary['Region']}",
+            f"Country: {summary['Country']}",
+            f"Timezone: {summary['Timezone']}",
+        ]
+    )
+    write_log_entry(details, str(log_file), Fore.LIGHTBLACK_EX)
+
+
 def run_ip_geolocation_test(log_path: str | None = None):
     if not config["Defaults"].get("EnableIPGeo", True):
         return None
@@ -43,8 +77,28 @@ def run_ip_geolocation_test(log_path: str | None = None):
         write_log_entry("Unable to determine external IP address.", str(log_file), Fore.RED)
         return None
 
+    database_path = config["Defaults"]["GeoDatabasePath"]
+    if database_path:
+        try:
+            record = open_database(database_path).lookup(external_ip)
+        except (OSError, ValueError) as exc:
+            write_log_entry(f"Offline geolocation database unavailable: {exc}", str(log_file), Fore.RED)
+            return None
+        if not record:
+            write_log_entry(f"{external_ip} is not in the offline geolocation database", str(log_file), Fore.RED)
+            return None
+        summary = geo_summary(external_ip, record)
+        _log_summary(summary, log_file)
+        return summary
+
+    cached = get_cached_geo([external_ip]).get(external_ip)
+    if cached:
+        write_log_entry(f"Using cached geolocation for {external_ip}", str(log_file), Fore.LIGHTBLACK_EX)
+        _log_summary(cached, log_file)
+        return cached
+
     try:
-        geo_response = requests.get(f"http://ip-api.com/json/{external_ip}", timeout=8)
+        geo_response = get_session().get(f"http://ip-api.com/json/{external_ip}", timeout=8)
         geo_response.raise_for_status()
         geo_json = geo_response.json()
     except Exception as exc:
@@ -55,24 +109,8 @@ def run_ip_geolocation_test(log_path: str | None = None):
         write_log_entry(f"Geolocation lookup failed for {external_ip}", str(log_file), Fore.RED)
         return None
 
-    summary = {
-        "ISP": geo_json.get("isp", "Unknown"),
-        "City": geo_json.get("city", "Unknown"),
-        "Region": geo_json.get("regionName", "Unknown"),
-        "Country": geo_json.get("country", "Unknown"),
-        "Timezone": geo_json.get("timezone", "Unknown"),
-        "IP": external_ip,
-    }
+    summary = geo_summary(external_ip, geo_json)
 
-    details = ", ".join(
-        [
-            f"ISP: {summary['ISP']}",
-            f"City: {summary['City']}",
-            f"Region: {summary['Region']}",
-            f"Country: {summary['Country']}",
-            f"Timezone: {summary['Timezone']}",
-        ]
-    )
-    write_log_entry(details, str(log_file), Fore.GRAY)
+    store_geo({external_ip: summary})
+    _log_summary(summary, log_file)
     return summary
-
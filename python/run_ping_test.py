@@ -1,44 +1,149 @@
 import platform
 import re
 import subprocess
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from colorama import Fore, Style
 
 from config import config
-from custom_logging import write_log_entry
+from custom_logging import open_log, write_log_entry
+from dns_cache import resolve_or_host
+from icmp_ping import icmp_available, iter_icmp_echoes
+from ping_stats import PingStats
+from tcp_ping import tcp_connect_samples, tcp_ping
 
 
 def _ping_command(target: str, count: int, delay_ms: int) -> list[str]:
     system = platform.system().lower()
     if system == "windows":
         return ["ping", target, "-n", str(count), "-w", str(delay_ms)]
-    interval = max(1, int(delay_ms / 1000))
-    return ["ping", "-c", str(count), "-i", str(interval), target]
+    # ping -i takes fractional seconds; non-root users may be held to a 200 ms floor
+    interval = f"{delay_ms / 1000:g}"
+    return ["ping", "-c", str(count), "-i", interval, target]
 
 
-def _parse_ping_output(output: str) -> tuple[list[float], float]:
-    latencies: list[float] = []
-    loss_percent = 0.0
+_REPLY_RE = re.compile(r"time[=<]([0-9.]+) ?ms")
+_SEQ_RE = re.compile(r"icmp_seq=(\d+)")
+_LOSS_RE = re.compile(r"(\d+)%\s+packet loss|Lost = \d+ \((\d+)%\)", re.IGNORECASE)
+_TIMEOUT_PHRASES = ("Request timed out", "Destination host unreachable", "no answer yet")
 
-    # Capture per-reply times
-    for match in re.finditer(r"time[=<]([0-9.]+) ?ms", output):
+
+def _parse_loss(text: str) -> float | None:
+    loss_match = _LOSS_RE.search(text)
+    if loss_match:
+        percent = next((g for g in loss_match.groups() if g), None)
+        if percent is not None:
+            return float(percent)
+    return None
+
+
+def _parse_ping_output(output: str) -> tuple[PingStats, float]:
+    stats = PingStats()
+
+    # Feed per-reply times straight into the histogram rather than collecting a list
+    for match in _REPLY_RE.finditer(output):
         try:
-            latencies.append(float(match.group(1)))
+            stats.add(float(match.group(1)))
         except ValueError:
             continue
 
     # Capture loss from summary
-    loss_match = re.search(r"(\d+)%\s+packet loss|Lost = \d+ \((\d+)%\)", output, re.IGNORECASE)
-    if loss_match:
-        percent = next((g for g in loss_match.groups() if g), None)
-        if percent is not None:
-            loss_percent = float(percent)
+    loss_percent = _parse_loss(output)
+    return stats, loss_percent or 0.0
+
+
+def _summarize(target: str, count: int, output: str) -> dict:
+    stats, loss_percent = _parse_ping_output(output)
+    return stats.summary(target, sent=count, loss_percent=loss_percent)
 
-    return latencies, loss_percent
+
+def _run_ping(target: str, count: int, delay_ms: int) -> str | None:
+    cmd = _ping_command(resolve_or_host(target), count, delay_ms)
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    except FileNotFoundError:
+        return None
+    return result.stdout or result.stderr or ""
+
+
+def _stream_ping(
+    target: str,
+    count: int,
+    delay_ms: int,
+    log_file: Path,
+    on_update: Callable[[PingStats], None] | None = None,
+) -> dict | None:
+    cmd = _ping_command(resolve_or_host(target), count, delay_ms)
+    try:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+    except FileNotFoundError:
+        return None
+
+    stats = PingStats()
+    last_seq = 0
+    loss_percent = None
+    with open_log(log_file) as handle:
+        for line in process.stdout or []:
+            handle.write(line)
+            print(Fore.LIGHTBLACK_EX + line.rstrip() + Style.RESET_ALL)
+
+            reply = _REPLY_RE.search(line)
+            if reply:
+                seq_match = _SEQ_RE.search(line)
+                if seq_match:
+                    # Linux ping prints nothing for lost echoes, so gaps in icmp_seq are the loss signal
+                    seq = int(seq_match.group(1))
+                    if seq > last_seq + 1:
+                        stats.add_loss(seq - last_seq - 1)
+                    last_seq = max(last_seq, seq)
+                stats.add(float(reply.group(1)))
+            elif any(phrase in line for phrase in _TIMEOUT_PHRASES):
+                stats.add_loss()
+            else:
+                if loss_percent is None:
+                    loss_percent = _parse_loss(line)
+                continue
+
+            if on_update:
+                on_update(stats)
+
+    process.wait()
+    return stats.summary(target, sent=count, loss_percent=loss_percent)
+
+
+def _tcp_fallback(target: str, count: int, log_file: Path) -> dict | None:
+    port = config["Defaults"]["TcpPingPort"]
+    write_log_entry(
+        f"Ping command not available on this system; timing TCP handshakes to port {port} instead.",
+        str(log_file),
+        Fore.YELLOW,
+    )
+    try:
+        summary = tcp_ping(target, port=port, count=count)
+    except OSError as exc:
+        write_log_entry(f"TCP latency probe failed: {exc}", str(log_file), Fore.RED)
+        return None
+    write_log_entry(
+        (
+            f"TCP connect to {target}:{port}: {summary['AverageLatency']}ms avg, "
+            f"{summary['Jitter']}ms jitter, {summary['LossPercent']}% loss"
+        ),
+        str(log_file),
+        Fore.LIGHTBLACK_EX,
+    )
+    return summary
 
 
-def run_ping_test(target: str, count: int | None = None, delay_ms: int | None = None, log_path: str | None = None):
+def run_ping_test(
+    target: str,
+    count: int | None = None,
+    delay_ms: int | None = None,
+    log_path: str | None = None,
+    stream: bool = False,
+    on_update: Callable[[PingStats], None] | None = None,
+):
     count = count or config["Defaults"]["PingCount"]
     delay_ms = delay_ms or config["Defaults"]["PingDelay"]
     log_file = Path(log_path or Path(config["Defaults"]["LogDirectory"]) / "ping.log")
@@ -47,39 +152,176 @@ def run_ping_test(target: str, count: int | None = None, delay_ms: int | None =
     write_log_entry("--- Ping Test ---", str(log_file), "Cyan")
     write_log_entry(f"Pinging {target} {count} times...", str(log_file), "Gray")
 
-    cmd = _ping_command(target, count, delay_ms)
+    if stream:
+        # Lines are teed to the log as they arrive and folded into running stats,
+        # so memory stays flat no matter how long the capture runs.
+        summary = _stream_ping(target, count, delay_ms, log_file, on_update)
+        if summary is None:
+            return _tcp_fallback(target, count, log_file)
+        return summary
+
+    output = _run_ping(target, count, delay_ms)
+    if output is None:
+        return _tcp_fallback(target, count, log_file)
+
+    with open_log(log_file) as handle:
+        handle.write(output + "\n")
+
+    print(Fore.CYAN + "\nPing statistics" + Style.RESET_ALL)
+    print(Fore.LIGHTBLACK_EX + output + Style.RESET_ALL)
+
+    return _summarize(target, count, output)
+
+
+def _in_send_order(echoes: Iterable[tuple[int, float | None]]) -> Iterator[float | None]:
+    # Echo results complete out of order; hold them until the next index in send order arrives
+    pending: dict[int, float | None] = {}
+    next_index = 0
+    for index, rtt in echoes:
+        pending[index] = rtt
+        while next_index in pending:
+            yield pending.pop(next_index)
+            next_index += 1
+
+
+def run_high_rate_ping_test(
+    target: str,
+    count: int | None = None,
+    interval_ms: float | None = None,
+    timeout_ms: float | None = None,
+    log_path: str | None = None,
+    on_update: Callable[[PingStats], None] | None = None,
+):
+    """Sample RTT at sub-second intervals to expose microbursts and short loss events."""
+    defaults = config["Defaults"]
+    count = count or defaults["HighRateCount"]
+    interval_ms = interval_ms or defaults["HighRateInterval"]
+    timeout_ms = timeout_ms or defaults["PingDelay"]
+    log_file = Path(log_path or Path(defaults["LogDirectory"]) / "ping.log")
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
+    write_log_entry("--- High-Rate Ping Test ---", str(log_file), Fore.CYAN)
+    write_log_entry(f"Pinging {target} {count} times every {interval_ms} ms...", str(log_file), Fore.LIGHTBLACK_EX)
+
+    use_icmp = icmp_available()
+    if not use_icmp:
+        # Unprivileged system ping refuses sub-200 ms intervals, so time TCP handshakes instead
+        write_log_entry(
+            f"ICMP sockets not permitted; timing TCP handshakes to port {defaults['TcpPingPort']} instead.",
+            str(log_file),
+            Fore.YELLOW,
+        )
+
+    stats = PingStats()
+    loss_events = 0
+    max_loss_burst = 0
+    loss_run = 0
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-    except FileNotFoundError:
-        write_log_entry("Ping command not available on this system.", str(log_file), "Red")
+        if use_icmp:
+            samples = _in_send_order(iter_icmp_echoes(target, count, interval_ms, timeout_ms))
+        else:
+            samples = tcp_connect_samples(target, count=count, interval_ms=interval_ms, timeout_ms=timeout_ms)
+        with open_log(log_file) as handle:
+            for index, rtt in enumerate(samples):
+                if rtt is None:
+                    stats.add_loss()
+                    loss_run += 1
+                    if loss_run == 1:
+                        loss_events += 1
+                    max_loss_burst = max(max_loss_burst, loss_run)
+                    handle.write(f"seq={index} timeout\n")
+                else:
+                    stats.add(rtt)
+                    loss_run = 0
+                    handle.write(f"seq={index} time={rtt:.3f} ms\n")
+                if on_update:
+                    on_update(stats)
+    except OSError as exc:
+        # Unresolvable target (socket.gaierror) or a send/receive failure on the socket
+        write_log_entry(f"High-rate ping to {target} failed: {exc}", str(log_file), Fore.RED)
         return None
 
-    output = result.stdout or result.stderr or ""
-    with open(log_file, "a", encoding="utf-8") as handle:
-        handle.write(output + "\n")
+    summary = stats.summary(target, sent=count, digits=3)
+    summary["IntervalMs"] = interval_ms
+    summary["LossEvents"] = loss_events
+    summary["MaxLossBurst"] = max_loss_burst
+    write_log_entry(
+        (
+            f"{target}: {summary['AverageLatency']}ms avg, {summary['P99Latency']}ms p99, "
+            f"{summary['MaxLatency']}ms max, {summary['LossPercent']}% loss "
+            f"({loss_events} loss events, longest {max_loss_burst} in a row)"
+        ),
+        str(log_file),
+        Fore.YELLOW,
+    )
+    return summary
 
-    latencies, loss_percent = _parse_ping_output(output)
-    jitter = 0.0
-    if len(latencies) > 1:
-        diffs = [abs(latencies[i] - latencies[i - 1]) for i in range(1, len(latencies))]
-        jitter = sum(diffs) / len(diffs)
 
-    avg_latency = sum(latencies) / len(latencies) if latencies else 0.0
-    min_latency = min(latencies) if latencies else 0.0
-    max_latency = max(latencies) if latencies else 0.0
+def run_multi_ping_test(
+    targets: list[str],
+    count: int | None = None,
+    delay_ms: int | None = None,
+    log_path: str | None = None,
+    max_workers: int | None = None,
+) -> dict[str, dict | None]:
+    """Ping every target at once and return one summary per target, in input order."""
+    defaults = config["Defaults"]
+    count = count or defaults["PingCount"]
+    delay_ms = delay_ms or defaults["PingDelay"]
+    max_workers = max_workers or defaults["PingMaxWorkers"]
+    log_file = Path(log_path or Path(defaults["LogDirectory"]) / "ping.log")
+    log_file.parent.mkdir(parents=True, exist_ok=True)
 
-    print(Fore.CYAN + "\nPing statistics" + Style.RESET_ALL)
-    print(Fore.LIGHTBLACK_EX + output + Style.RESET_ALL)
+    targets = list(dict.fromkeys(targets))
+    write_log_entry("--- Multi-Target Ping Test ---", str(log_file), Fore.CYAN)
+    write_log_entry(f"Pinging {len(targets)} targets {count} times each...", str(log_file), Fore.LIGHTBLACK_EX)
 
-    return {
-        "Target": target,
-        "Sent": count,
-        "Received": count - int((loss_percent / 100) * count),
-        "Lost": int((loss_percent / 100) * count),
-        "LossPercent": loss_percent,
-        "AverageLatency": round(avg_latency, 2),
-        "Jitter": round(jitter, 2),
-        "MinLatency": round(min_latency, 2),
-        "MaxLatency": round(max_latency, 2),
-    }
+    if not targets:
+        return {}
 
+    port = defaults["TcpPingPort"]
+
+    def probe(target: str) -> tuple[str | None, dict | None]:
+        output = _run_ping(target, count, delay_ms)
+        if output is not None:
+            return output, None
+        # No ping binary: time TCP handshakes instead, as run_ping_test does
+        try:
+            return None, tcp_ping(target, port=port, count=count)
+        except OSError:
+            return None, None
+
+    # Each worker only waits on its own ping process; logging happens afterwards
+    # on this thread so per-target output blocks never interleave in the log.
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(targets))) as pool:
+        results = list(pool.map(probe, targets))
+
+    if any(output is None for output, _tcp in results):
+        write_log_entry(
+            f"Ping command not available on this system; timing TCP handshakes to port {port} instead.",
+            str(log_file),
+            Fore.YELLOW,
+        )
+
+    summaries: dict[str, dict | None] = {}
+    with open_log(log_file) as handle:
+        for target, (output, tcp_summary) in zip(targets, results):
+            if output is None:
+                summaries[target] = tcp_summary
+                continue
+            handle.write(f"\n--- {target} ---\n{output}\n")
+            summaries[target] = _summarize(target, count, output)
+
+    for target, summary in summaries.items():
+        if summary is None:
+            write_log_entry(f"{target}: TCP latency probe failed", str(log_file), Fore.RED)
+            continue
+        write_log_entry(
+            (
+                f"{target}: {summary['AverageLatency']}ms avg, {summary['P99Latency']}ms p99, "
+                f"{summary['Jitter']}ms jitter, {summary['LossPercent']}% loss"
+            ),
+            str(log_file),
+            Fore.YELLOW,
+        )
+    return summaries
@@ -4,16 +4,10 @@ import statistics
 from pathlib import Path
 from colorama import Fore, Style
 
-# Assuming write_log_entry is already defined
-
-def run_ping_test(target: str, count: int = 4, delay_ms: int = 1000, log_path: str = "ping_log.txt"):
-    write_log_entry("--- Ping Test ---", log_path, color="Cyan")
-    write_log_entry(f"Pinging {target} with 32 bytes of data:", log_path, color="Gray")
-    print(f"\n{Fore.CYAN}Pinging {target} with 32 bytes of data:\n{Style.RESET_ALL}")
-
-    latencies = []
-    success_count = 0
+from custom_logging import open_log, write_log_entry
+from icmp_ping import icmp_available, iter_icmp_echoes
 
+def _subprocess_echoes(target: str, count: int, delay_ms: int, log_path: str):
     for i in range(count):
         try:
             result = subprocess.run(
@@ -23,31 +17,54 @@ def run_ping_test(target: str, count: int = 4, delay_ms: int = 1000, log_path: s
                 shell=True
             )
             output = result.stdout
+            latency = None
             if "Reply from" in output:
-                # Extract latency
+                latency_str = next(
+                    (part for part in output.split() if "time=" in part),
+                    "time=0ms"
+                ).replace("time=", "").replace("ms", "")
                 try:
-                    latency_str = next(
-                        (part for part in output.split() if "time=" in part),
-                        "time=0ms"
-                    ).replace("time=", "").replace("ms", "")
                     latency = float(latency_str)
-                    latencies.append(latency)
-                    success_count += 1
-                    print(f"{Fore.GREEN}Reply from {target}: bytes=32 time={latency}ms TTL=?{Style.RESET_ALL}")
-                    with open(log_path, "a", encoding="utf-8") as log_file:
-                        log_file.write(f"Reply from {target}: bytes=32 time={latency}ms TTL=?\n")
-                except Exception:
+                except ValueError:
                     pass
-            else:
-                print(f"{Fore.RED}Request timed out.{Style.RESET_ALL}")
-                with open(log_path, "a", encoding="utf-8") as log_file:
-                    log_file.write("Request timed out.\n")
+            yield i, latency
         except Exception as e:
             print(f"{Fore.RED}Ping failed: {e}{Style.RESET_ALL}")
-            with open(log_path, "a", encoding="utf-8") as log_file:
+            with open_log(log_path) as log_file:
                 log_file.write(f"Ping failed: {e}\n")
         time.sleep(delay_ms / 1000)
 
+def run_ping_test(target: str, count: int = 4, delay_ms: int = 1000, log_path: str = "ping_log.txt"):
+    write_log_entry("--- Ping Test ---", log_path, Fore.CYAN)
+    write_log_entry(f"Pinging {target} with 32 bytes of data:", log_path, Fore.LIGHTBLACK_EX)
+    print(f"\n{Fore.CYAN}Pinging {target} with 32 bytes of data:\n{Style.RESET_ALL}")
+
+    latencies = []
+    success_count = 0
+
+    # Prefer in-process ICMP echoes; spawning ping per sample costs a fork/exec each time
+    if icmp_available():
+        echoes = iter_icmp_echoes(target, count, interval_ms=delay_ms, timeout_ms=delay_ms)
+    else:
+        echoes = _subprocess_echoes(target, count, delay_ms, log_path)
+
+    try:
+        for _seq, latency in echoes:
+            if latency is not None:
+                latencies.append(latency)
+                success_count += 1
+                print(f"{Fore.GREEN}Reply from {target}: bytes=32 time={latency:.3f}ms TTL=?{Style.RESET_ALL}")
+                with open_log(log_path) as log_file:
+                    log_file.write(f"Reply from {target}: bytes=32 time={latency:.3f}ms TTL=?\n")
+            else:
+                print(f"{Fore.RED}Request timed out.{Style.RESET_ALL}")
+                with open_log(log_path) as log_file:
+                    log_file.write("Request timed out.\n")
+    except OSError as exc:
+        # Unresolvable target (socket.gaierror) or a send/receive failure on the ICMP socket
+        write_log_entry(f"Ping to {target} failed: {exc}", log_path, Fore.RED)
+        return None
+
     # Summary
     loss = count - success_count
     loss_percent = round((loss / count) * 100, 2) if count else 0
@@ -62,7 +79,7 @@ def run_ping_test(target: str, count: int = 4, delay_ms: int = 1000, log_path: s
     print(f"{Fore.LIGHTBLACK_EX}Approximate round trip times in milliseconds:{Style.RESET_ALL}")
     print(f"{Fore.YELLOW}    Minimum = {min_latency}ms, Maximum = {max_latency}ms, Average = {avg}ms, Jitter = {jitter}ms{Style.RESET_ALL}")
 
-    with open(log_path, "a", encoding="utf-8") as log_file:
+    with open_log(log_path) as log_file:
         log_file.write(f"\nPing statistics for {target}:\n")
         log_file.write(f"    Packets: Sent = {count}, Received = {success_count}, Lost = {loss} ({loss_percent}% loss)\n")
         log_file.write(f"    Minimum = {min_latency}ms, Maximum = {max_latency}ms, Average = {avg}ms, Jitter = {jitter}ms\n")
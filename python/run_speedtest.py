@@ -1,46 +1,118 @@
 from pathlib import Path
+from urllib.parse import urlsplit
 
-import speedtest
 from colorama import Fore, Style
 
 from config import config
-from custom_logging import write_log_entry
+from custom_logging import open_log, write_log_entry
+from speedtest_server_cache import get_cached_servers, store_servers
+from tcp_ping import tcp_ping
+from throughput import measure_throughput
 
 
-def run_speed_test(log_path: str | None = None):
-    log_file = Path(log_path or Path(config["Defaults"]["LogDirectory"]) / "speedtest.log")
+def _speedtest_cli() -> dict:
+    # Imported here so the native engine works where speedtest-cli is not installed
+    import speedtest
+
+    st = speedtest.Speedtest()
+    client_ip = st.config["client"]["ip"]
+    cached = get_cached_servers(client_ip)
+    if cached:
+        baseline = cached["Best"]["latency"]
+        try:
+            # Latency-test only the cached best server; reselect from the cached list if it degraded
+            best = st.get_best_server([cached["Best"]])
+            degraded = best["latency"] > baseline * config["Defaults"]["SpeedtestReselectFactor"]
+        except speedtest.SpeedtestBestServerFailure:
+            degraded = True
+        if degraded:
+            try:
+                best = st.get_best_server(cached["Servers"])
+                store_servers(client_ip, cached["Servers"], best)
+            except speedtest.SpeedtestBestServerFailure:
+                cached = None
+    if not cached:
+        best = st.get_best_server()
+        store_servers(client_ip, st.closest, best)
+    return {
+        "Download": round(st.download() / 1_000_000, 2),
+        "Upload": round(st.upload() / 1_000_000, 2),
+        "Ping": round(st.results.ping, 2),
+        "Server": st.results.server.get("name", "Unknown"),
+        "ServerId": st.results.server.get("id", "N/A"),
+        "ISP": st.results.client.get("isp", "Unknown"),
+    }
+
+
+def _native(download_url: str, upload_url: str, streams: int, duration_s: float) -> dict:
+    defaults = config["Defaults"]
+    buffer_size = defaults["ThroughputBufferSize"]
+    download = measure_throughput(download_url, "download", streams, duration_s, buffer_size)
+    upload = measure_throughput(
+        upload_url, "upload", streams, duration_s, buffer_size, defaults["ThroughputUploadBytes"]
+    )
+    server = urlsplit(download_url)
+    ping = tcp_ping(server.hostname, server.port or (443 if server.scheme == "https" else 80), count=5)
+    return {
+        "Download": download["Mbps"],
+        "Upload": upload["Mbps"],
+        "Ping": ping["AverageLatency"],
+        "Server": server.netloc,
+        "ServerId": "N/A",
+        "ISP": "Unknown",
+        "DownloadStreams": download["StreamMbps"],
+        "UploadStreams": upload["StreamMbps"],
+    }
+
+
+def run_speed_test(
+    log_path: str | None = None,
+    engine: str | None = None,
+    download_url: str | None = None,
+    upload_url: str | None = None,
+    streams: int | None = None,
+    duration_s: float | None = None,
+):
+    """Measure bandwidth with speedtest-cli or, for engine="native", parallel HTTP streams to our own URLs."""
+    defaults = config["Defaults"]
+    engine = engine or defaults["SpeedtestEngine"]
+    log_file = Path(log_path or Path(defaults["LogDirectory"]) / "speedtest.log")
     log_file.parent.mkdir(parents=True, exist_ok=True)
 
     write_log_entry("--- Speed Test ---", str(log_file), Fore.CYAN)
 
     try:
-        st = speedtest.Speedtest()
-        st.get_best_server()
-        download = round(st.download() / 1_000_000, 2)
-        upload = round(st.upload() / 1_000_000, 2)
-        ping = round(st.results.ping, 2)
-        server = st.results.server.get("name", "Unknown")
-        server_id = st.results.server.get("id", "N/A")
-        isp = st.results.client.get("isp", "Unknown")
+        if engine == "native":
+            streams = streams or defaults["ThroughputStreams"]
+            write_log_entry(f"Running native throughput test with {streams} streams...", str(log_file), Fore.LIGHTBLACK_EX)
+            summary = _native(
+                download_url or defaults["ThroughputDownloadURL"],
+                upload_url or defaults["ThroughputUploadURL"],
+                streams,
+                duration_s or defaults["ThroughputDuration"],
+            )
+        else:
+            summary = _speedtest_cli()
     except Exception as exc:
         write_log_entry(f"Speedtest failed: {exc}", str(log_file), Fore.RED)
         return None
 
-    summary = {
-        "Download": download,
-        "Upload": upload,
-        "Ping": ping,
-        "Server": server,
-        "ServerId": server_id,
-        "ISP": isp,
-    }
+    download = summary["Download"]
+    upload = summary["Upload"]
+    ping = summary["Ping"]
+    server = summary["Server"]
+    server_id = summary["ServerId"]
+    isp = summary["ISP"]
 
-    with open(log_file, "a", encoding="utf-8") as handle:
+    with open_log(log_file) as handle:
         handle.write(f"Download: {download} Mbps\n")
         handle.write(f"Upload:   {upload} Mbps\n")
         handle.write(f"Ping:     {ping} ms\n")
         handle.write(f"Server:   {server} [ID: {server_id}]\n")
         handle.write(f"ISP:      {isp}\n")
+        if "DownloadStreams" in summary:
+            handle.write(f"Download per stream: {summary['DownloadStreams']} Mbps\n")
+            handle.write(f"Upload per stream:   {summary['UploadStreams']} Mbps\n")
 
     print(Fore.GREEN + "\n--- Speedtest Results ---" + Style.RESET_ALL)
     print(Fore.YELLOW + f"Download: {download} Mbps" + Style.RESET_ALL)
@@ -48,6 +120,7 @@ def run_speed_test(log_path: str | None = None):
     print(Fore.YELLOW + f"Ping:     {ping} ms" + Style.RESET_ALL)
     print(Fore.LIGHTBLACK_EX + f"Server:   {server} [ID: {server_id}]" + Style.RESET_ALL)
     print(Fore.LIGHTBLACK_EX + f"ISP:      {isp}" + Style.RESET_ALL)
+    if "DownloadStreams" in summary:
+        print(Fore.LIGHTBLACK_EX + f"Per stream: down {summary['DownloadStreams']} / up {summary['UploadStreams']} Mbps" + Style.RESET_ALL)
 
     return summary
-
@@ -1,39 +1,237 @@
 import platform
-import socket
+import re
 import subprocess
+import time
+from collections.abc import Callable
 from pathlib import Path
 
 from colorama import Fore, Style
 
+from bulk_geolocation import annotate_hop_locations
 from config import config
-from custom_logging import write_log_entry
+from custom_logging import open_log, write_log_entry
+from dns_cache import resolve
+from parallel_traceroute import parallel_traceroute
+from ping_stats import PingStats
+from reverse_dns import annotate_hops
+
+
+_HOP_RE = re.compile(r"^\s*(\d+)\s+(.*)$")
+_HOP_TOKEN_RE = re.compile(
+    r"(?P<star>\*)"
+    r"|<?(?P<rtt>\d+(?:\.\d+)?)\s*ms"
+    r"|(?P<name>[^\s()\[\]]+)\s+[(\[](?P<named_ip>[0-9a-fA-F.:]+)[)\]]"
+    r"|(?P<ip>\d{1,3}(?:\.\d{1,3}){3}|[0-9a-fA-F]*:[0-9a-fA-F:]+)"
+)
+
+
+def parse_hop_line(line: str) -> dict | None:
+    """Parse one traceroute/tracert hop line into a hop record, or None for headers and footers."""
+    match = _HOP_RE.match(line)
+    if not match:
+        return None
+    hop = {"TTL": int(match.group(1)), "Address": None, "Name": None, "RTTs": []}
+    for token in _HOP_TOKEN_RE.finditer(match.group(2)):
+        if token.group("star"):
+            hop["RTTs"].append(None)
+        elif token.group("rtt"):
+            hop["RTTs"].append(float(token.group("rtt")))
+        elif hop["Address"] is None:
+            # Later addresses on the same line are alternate responders; keep the first
+            hop["Address"] = token.group("named_ip") or token.group("ip")
+            hop["Name"] = token.group("name")
+    return hop
+
+
+def format_hop(hop: dict) -> str:
+    times = "  ".join(f"{rtt:.3f} ms" if rtt is not None else "*" for rtt in hop["RTTs"])
+    host = hop["Address"] or "*"
+    if hop.get("Name"):
+        host = f"{hop['Name']} ({host})"
+    line = f"{hop['TTL']:>2}  {host}  {times}"
+    geo = hop.get("Geo")
+    if geo:
+        line += f"  [{geo.get('City', 'Unknown')}, {geo.get('Country', 'Unknown')} | {geo.get('ASN', 'Unknown')}]"
+    return line
+
+
+def _trace(resolved_target: str, probes: int, log_file: Path, verbose: bool = True) -> list[dict] | None:
+    defaults = config["Defaults"]
+    if defaults["TracerouteEngine"] == "parallel":
+        try:
+            hops = parallel_traceroute(
+                resolved_target,
+                max_hops=defaults["TracerouteMaxHops"],
+                probes=probes,
+                timeout_ms=defaults["TracerouteTimeout"],
+            )
+        except OSError as exc:
+            write_log_entry(
+                f"Parallel traceroute unavailable ({exc}); using system traceroute.",
+                str(log_file),
+                Fore.YELLOW,
+            )
+        else:
+            return hops
+
+    # Always numeric: hop names are filled in afterwards by one batched reverse lookup
+    system = platform.system().lower()
+    if system == "windows":
+        cmd = ["tracert", "-d", "-h", str(defaults["TracerouteMaxHops"]), resolved_target]
+    else:
+        cmd = ["traceroute", "-n", "-q", str(probes), "-m", str(defaults["TracerouteMaxHops"]), resolved_target]
+
+    try:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    except FileNotFoundError:
+        write_log_entry(f"{cmd[0]} command not available.", str(log_file), Fore.RED)
+        return None
+
+    hops = []
+    with open_log(log_file) as handle:
+        for line in process.stdout or []:
+            hop = parse_hop_line(line)
+            if hop:
+                hops.append(hop)
+            if verbose:
+                handle.write(line)
+
+    process.wait()
+    return hops
 
 
 def run_traceroute_test(target: str, log_path: str | None = None):
+    """Trace the path to ``target`` and return its hop records, or False if it could not run."""
     log_file = Path(log_path or Path(config["Defaults"]["LogDirectory"]) / "traceroute.log")
     log_file.parent.mkdir(parents=True, exist_ok=True)
 
     write_log_entry("--- Traceroute Test ---", str(log_file), Fore.CYAN)
 
     try:
-        resolved_target = socket.gethostbyname(target)
+        resolved_target = resolve(target)
     except Exception as exc:
         write_log_entry(f"DNS resolution failed: {exc}", str(log_file), Fore.RED)
         return False
 
-    system = platform.system().lower()
-    cmd = ["tracert", resolved_target] if system == "windows" else ["traceroute", resolved_target]
+    hops = _trace(resolved_target, config["Defaults"]["TracerouteProbes"], log_file)
+    if hops is None:
+        return False
+
+    annotate_hops(hops)
+    if config["Defaults"]["TracerouteGeolocate"] and config["Defaults"].get("EnableIPGeo", True):
+        try:
+            annotate_hop_locations(hops)
+        except Exception as exc:
+            write_log_entry(f"Hop geolocation failed: {exc}", str(log_file), Fore.YELLOW)
+    with open_log(log_file) as handle:
+        for hop in hops:
+            line = format_hop(hop)
+            handle.write(line + "\n")
+            print(Fore.LIGHTBLACK_EX + line + Style.RESET_ALL)
+    return hops
+
+
+def run_mtr_test(
+    target: str,
+    rounds: int | None = None,
+    interval_s: float | None = None,
+    log_path: str | None = None,
+    on_round: Callable[[list[dict]], None] | None = None,
+):
+    """Repeat single-probe traces and keep running per-hop loss and RTT statistics, MTR style."""
+    defaults = config["Defaults"]
+    rounds = rounds or defaults["MTRRounds"]
+    interval_s = defaults["MTRInterval"] if interval_s is None else interval_s
+    log_file = Path(log_path or Path(defaults["LogDirectory"]) / "traceroute.log")
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
+    write_log_entry(f"--- MTR Test ({rounds} rounds) ---", str(log_file), Fore.CYAN)
 
     try:
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-    except FileNotFoundError:
-        write_log_entry(f"{cmd[0]} command not available.", str(log_file), Fore.RED)
-        return False
+        resolved_target = resolve(target)
+    except Exception as exc:
+        write_log_entry(f"DNS resolution failed: {exc}", str(log_file), Fore.RED)
+        return None
 
-    with open(log_file, "a", encoding="utf-8") as handle:
-        for line in process.stdout or []:
-            handle.write(line)
-            print(Fore.LIGHTBLACK_EX + line.strip() + Style.RESET_ALL)
+    hop_stats: dict[int, PingStats] = {}
+    hop_address: dict[int, str | None] = {}
+    last_rtt: dict[int, float | None] = {}
+    # Traces end at the highest TTL that answered, so a lost reply from the last hop (usually the
+    # destination) drops that TTL from the round entirely. Track the deepest TTL seen in any round
+    # and count every TTL up to it that a round is missing as a loss.
+    deepest_ttl = 0
+
+    def stats_for(ttl: int) -> PingStats:
+        if ttl not in hop_stats:
+            # A hop first seen now was silent in every earlier round
+            hop_stats[ttl] = PingStats()
+            for _ in range(round_index):
+                hop_stats[ttl].add_loss()
+        return hop_stats[ttl]
+
+    for round_index in range(rounds):
+        started = time.monotonic()
+        hops = _trace(resolved_target, 1, log_file, verbose=False)
+        if hops is None:
+            return None
+        for hop in hops:
+            stats = stats_for(hop["TTL"])
+            for rtt in hop["RTTs"] or [None]:
+                if rtt is None:
+                    stats.add_loss()
+                else:
+                    stats.add(rtt)
+            last_rtt[hop["TTL"]] = hop["RTTs"][-1] if hop["RTTs"] else None
+            if hop["Address"]:
+                hop_address[hop["TTL"]] = hop["Address"]
+            else:
+                hop_address.setdefault(hop["TTL"], None)
+
+        seen = {hop["TTL"] for hop in hops}
+        deepest_ttl = max([deepest_ttl, *seen])
+        for ttl in range(1, deepest_ttl + 1):
+            if ttl not in seen:
+                stats_for(ttl).add_loss()
+                last_rtt[ttl] = None
+                hop_address.setdefault(ttl, None)
+
+        if on_round:
+            on_round(_mtr_report(hop_stats, hop_address, last_rtt))
+        if round_index < rounds - 1:
+            time.sleep(max(0.0, interval_s - (time.monotonic() - started)))
+
+    report = _mtr_report(hop_stats, hop_address, last_rtt)
+    annotate_hops(report)
+    with open_log(log_file) as handle:
+        header = f"{'Hop':>3}  {'Host':<40} {'Loss%':>6} {'Snt':>4} {'Last':>8} {'Avg':>8} {'Best':>8} {'Wrst':>8}"
+        handle.write(header + "\n")
+        print(Fore.CYAN + header + Style.RESET_ALL)
+        for hop in report:
+            line = (
+                f"{hop['TTL']:>3}  {hop['Name'] or hop['Address'] or '???':<40} {hop['LossPercent']:>6} {hop['Sent']:>4} "
+                f"{'*' if hop['Last'] is None else hop['Last']:>8} {hop['Average']:>8} {hop['Best']:>8} {hop['Worst']:>8}"
+            )
+            handle.write(line + "\n")
+            print((Fore.RED if hop["LossPercent"] else Fore.LIGHTBLACK_EX) + line + Style.RESET_ALL)
+    return report
 
-    return process.wait() == 0
 
+def _mtr_report(hop_stats: dict[int, PingStats], hop_address: dict[int, str | None], last_rtt: dict) -> list[dict]:
+    report = []
+    for ttl in sorted(hop_stats):
+        stats = hop_stats[ttl]
+        last = last_rtt.get(ttl)
+        report.append(
+            {
+                "TTL": ttl,
+                "Address": hop_address.get(ttl),
+                "Name": None,
+                "Sent": stats.sent,
+                "LossPercent": stats.loss_percent,
+                "Last": round(last, 2) if last is not None else None,
+                "Average": round(stats.mean, 2),
+                "Best": round(stats.min or 0.0, 2),
+                "Worst": round(stats.max or 0.0, 2),
+            }
+        )
+    return report
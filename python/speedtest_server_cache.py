@@ -0,0 +1,18 @@
+from json_cache import JSONCache
+
+
+_cache = JSONCache("speedtest_servers.json", "SpeedtestServerCacheTTL")
+
+
+def get_cached_servers(client_ip: str, ttl: float | None = None) -> dict | None:
+    """Return {"Servers", "Best", ...} cached for this client IP if younger than ``ttl`` seconds.
+
+    Keyed by the public IP speedtest.net reports so moving to another network
+    triggers a fresh server selection.
+    """
+    return _cache.get(client_ip, ttl)
+
+
+def store_servers(client_ip: str, servers: list[dict], best: dict) -> bool:
+    """Cache the server list and best server for this client IP; returns False if the write failed."""
+    return _cache.store({client_ip: {"Servers": servers, "Best": best}})
@@ -0,0 +1,93 @@
+import asyncio
+import socket
+import time
+
+from config import config
+from dns_cache import resolve
+from ping_stats import PingStats
+
+
+async def _connect_rtt(loop: asyncio.AbstractEventLoop, address: tuple, timeout: float) -> float | None:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    try:
+        start_ns = time.perf_counter_ns()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, address), timeout)
+        except ConnectionRefusedError:
+            # A RST still means the host answered the SYN, which is all we are timing
+            pass
+        return (time.perf_counter_ns() - start_ns) / 1_000_000
+    except (asyncio.TimeoutError, OSError):
+        return None
+    finally:
+        sock.close()
+
+
+async def _tcp_ping_async(address: tuple, count: int, concurrency: int, timeout: float) -> list[float | None]:
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe() -> float | None:
+        async with semaphore:
+            return await _connect_rtt(loop, address, timeout)
+
+    return await asyncio.gather(*(probe() for _ in range(count)))
+
+
+async def _tcp_samples_async(address: tuple, count: int, interval: float, timeout: float) -> list[float | None]:
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = []
+    for i in range(count):
+        # Connects start on a fixed schedule; a slow handshake never delays the next one
+        await asyncio.sleep(max(0.0, start + i * interval - loop.time()))
+        tasks.append(asyncio.create_task(_connect_rtt(loop, address, timeout)))
+    return await asyncio.gather(*tasks)
+
+
+def tcp_connect_samples(
+    target: str,
+    port: int | None = None,
+    count: int | None = None,
+    interval_ms: float = 100,
+    timeout_ms: float | None = None,
+) -> list[float | None]:
+    """Return one handshake RTT (or None for loss) per connect, started every ``interval_ms``."""
+    defaults = config["Defaults"]
+    port = port or defaults["TcpPingPort"]
+    count = count or defaults["PingCount"]
+    timeout_ms = timeout_ms or defaults["TcpPingTimeout"]
+    address = (resolve(target), port)
+    return asyncio.run(_tcp_samples_async(address, count, interval_ms / 1000, timeout_ms / 1000))
+
+
+def tcp_ping(
+    target: str,
+    port: int | None = None,
+    count: int | None = None,
+    concurrency: int | None = None,
+    timeout_ms: float | None = None,
+) -> dict:
+    """Time TCP handshakes to ``target:port`` and summarise them like run_ping_test.
+
+    Raises OSError (socket.gaierror) when the target cannot be resolved.
+    """
+    defaults = config["Defaults"]
+    port = port or defaults["TcpPingPort"]
+    count = count or defaults["PingCount"]
+    concurrency = concurrency or defaults["TcpPingConcurrency"]
+    timeout_ms = timeout_ms or defaults["TcpPingTimeout"]
+
+    address = (resolve(target), port)
+    results = asyncio.run(_tcp_ping_async(address, count, concurrency, timeout_ms / 1000))
+    stats = PingStats()
+    for rtt in results:
+        if rtt is None:
+            stats.add_loss()
+        else:
+            stats.add(rtt)
+
+    summary = stats.summary(target, sent=count)
+    summary["Port"] = port
+    return summary
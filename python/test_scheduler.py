@@ -0,0 +1,58 @@
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any
+
+from colorama import Fore
+
+from custom_logging import write_log_entry
+
+
+def run_scheduled(
+    tests: dict[str, tuple[Callable[[], Any], set[str], bool]],
+    log_path: str,
+    parallel: bool = True,
+) -> dict[str, Any]:
+    """Run ``tests`` ({name: (func, resources, exclusive)}) and return {name: result}.
+
+    Tests start in declaration order as soon as none of their resources are held by a
+    running test. An exclusive test (e.g. one that saturates the link) waits until
+    nothing else is running and keeps everything else waiting until it finishes.
+    A test that raises is logged and reported as None.
+    """
+    results: dict[str, Any] = {}
+    pending = list(tests)
+    running = {}
+    held: set[str] = set()
+    exclusive_running = False
+
+    with ThreadPoolExecutor(max_workers=len(tests) if parallel else 1) as pool:
+        while pending or running:
+            for name in list(pending):
+                func, resources, exclusive = tests[name]
+                if exclusive_running or held & resources or (exclusive and running):
+                    if exclusive or not parallel:
+                        # Keep declaration order around exclusive tests and in sequential mode
+                        break
+                    continue
+                if not parallel and running:
+                    break
+                pending.remove(name)
+                running[pool.submit(func)] = name
+                held |= resources
+                exclusive_running = exclusive
+                if exclusive:
+                    break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                held -= tests[name][1]
+                if tests[name][2]:
+                    exclusive_running = False
+                try:
+                    results[name] = future.result()
+                except Exception as exc:
+                    write_log_entry(f"{name} failed: {exc}", log_path, Fore.RED)
+                    results[name] = None
+
+    return {name: results.get(name) for name in tests}
@@ -0,0 +1,111 @@
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def _connect(url: str, timeout: float) -> tuple[http.client.HTTPConnection, str]:
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    return connection_class(parts.hostname, parts.port, timeout=timeout), path
+
+
+def _download_stream(url: str, deadline: float, buffer_size: int, totals: list[int], errors: list, slot: int):
+    # One buffer per stream, reused for every read so the hot loop never allocates
+    buffer = memoryview(bytearray(buffer_size))
+    connection, path = _connect(url, timeout=10)
+    try:
+        while time.perf_counter() < deadline:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            if response.status != 200:
+                raise http.client.HTTPException(f"HTTP {response.status} from {url}")
+            while time.perf_counter() < deadline:
+                read = response.readinto(buffer)
+                if not read:
+                    break
+                totals[slot] += read
+    except (OSError, http.client.HTTPException) as exc:
+        errors[slot] = exc
+    finally:
+        connection.close()
+
+
+def _upload_stream(
+    url: str, deadline: float, payload: memoryview, request_bytes: int, totals: list[int], errors: list, slot: int
+):
+    connection, path = _connect(url, timeout=10)
+    try:
+        while time.perf_counter() < deadline:
+            connection.putrequest("POST", path)
+            connection.putheader("Content-Type", "application/octet-stream")
+            connection.putheader("Content-Length", str(request_bytes))
+            connection.endheaders()
+            remaining = request_bytes
+            while remaining and time.perf_counter() < deadline:
+                chunk = payload if remaining >= len(payload) else payload[:remaining]
+                connection.send(chunk)
+                totals[slot] += len(chunk)
+                remaining -= len(chunk)
+            if remaining:
+                # Deadline hit mid-body; the half-sent request dies with the connection
+                return
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                raise http.client.HTTPException(f"HTTP {response.status} from {url}")
+    except (OSError, http.client.HTTPException) as exc:
+        errors[slot] = exc
+    finally:
+        connection.close()
+
+
+def measure_throughput(
+    url: str,
+    direction: str = "download",
+    streams: int = 4,
+    duration_s: float = 10,
+    buffer_size: int = 256 * 1024,
+    upload_bytes: int = 25_000_000,
+) -> dict:
+    """Saturate ``url`` with ``streams`` parallel HTTP connections for ``duration_s`` seconds.
+
+    Downloads GET ``url`` repeatedly, uploads POST ``upload_bytes`` per request from one
+    payload shared by every stream. Returns the aggregate and per-stream Mbps; raises
+    the first stream error when no stream moved any data.
+    """
+    if direction not in ("download", "upload"):
+        raise ValueError(f"direction must be 'download' or 'upload', not {direction!r}")
+
+    totals = [0] * streams
+    errors: list[Exception | None] = [None] * streams
+    payload = memoryview(bytes(buffer_size))
+    started = time.perf_counter()
+    deadline = started + duration_s
+    threads = []
+    for slot in range(streams):
+        if direction == "download":
+            args = (url, deadline, buffer_size, totals, errors, slot)
+            worker = _download_stream
+        else:
+            args = (url, deadline, payload, upload_bytes, totals, errors, slot)
+            worker = _upload_stream
+        threads.append(threading.Thread(target=worker, args=args, daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    if not any(totals):
+        raise next((exc for exc in errors if exc), OSError(f"No data transferred to or from {url}"))
+    return {
+        "Direction": direction.capitalize(),
+        "Streams": streams,
+        "Bytes": sum(totals),
+        "Seconds": round(elapsed, 2),
+        "Mbps": round(sum(totals) * 8 / elapsed / 1_000_000, 2),
+        "StreamMbps": [round(total * 8 / elapsed / 1_000_000, 2) for total in totals],
+        "Errors": sum(1 for exc in errors if exc),
+    }